@@ -1,12 +1,183 @@
+"""
+Bearer-token auth with hashed tokens, scopes and expiry.
+
+Tokens come from a JSON file (AUTH_TOKENS_FILE) that stores only SHA-256
+hashes:
+
+    {"tokens": [
+        {"name": "ci", "sha256": "<hex digest>", "scopes": ["yellow_flag"],
+         "expires_at": "2026-12-31T00:00:00Z"}
+    ]}
+
+`"scopes": ["*"]` grants every scope and `expires_at` may be omitted. The file
+is re-read when it changes (checked at most every AUTH_RELOAD_SECONDS), so
+tokens can be added, rotated or revoked without a restart. Without a token
+file, DEMO_BEARER_TOKEN is the only token and has every scope.
+
+Generate a token and its file entry with:
+
+    python -m api_service.app.core.auth <name> [scope ...]
+"""
+import hashlib
+import hmac
+import json
+import logging
 import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from serving.profiling import phase
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 DEMO_TOKEN = os.getenv("DEMO_BEARER_TOKEN", "mysecrettoken")
+TOKENS_FILE = os.getenv("AUTH_TOKENS_FILE")
+RELOAD_SECONDS = float(os.getenv("AUTH_RELOAD_SECONDS", "5"))
+
+ALL_SCOPES = "*"
+
+def hash_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+@dataclass(frozen=True)
+class TokenInfo:
+    name: str
+    digest: bytes
+    scopes: frozenset[str]
+    expires_at: Optional[float] = None  # unix time
+
+    def allows(self, scope: str) -> bool:
+        return ALL_SCOPES in self.scopes or scope in self.scopes
+
+def _parse_expiry(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+class TokenStore:
+    """
+    Token digests -> TokenInfo, swapped atomically on reload.
+
+    A lookup hashes the presented token and indexes the dict by digest, so
+    its cost doesn't depend on how many tokens exist. The hit is confirmed with
+    `hmac.compare_digest`, and timing can only reveal bits of a hash, not of
+    a token.
+    """
+
+    def __init__(self, path: Optional[Path | str] = None, demo_token: Optional[str] = None,
+                 reload_seconds: float = RELOAD_SECONDS):
+        self.path = Path(path) if path else None
+        self.demo_token = demo_token
+        self.reload_seconds = reload_seconds
+        self._tokens: dict[bytes, TokenInfo] = {}
+        self._mtime_ns: Optional[int] = None
+        self._next_check = 0.0
+        self.reload()
+
+    def _load(self) -> dict[bytes, TokenInfo]:
+        if self.path is None:
+            if not self.demo_token:
+                return {}
+            digest = hash_token(self.demo_token)
+            return {digest: TokenInfo("demo", digest, frozenset({ALL_SCOPES}))}
+        data = json.loads(self.path.read_text())
+        entries = data.get("tokens") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError('Token file must be an object with a "tokens" list')
+        tokens = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or not all(isinstance(entry.get(k), str) for k in ("name", "sha256")):
+                raise ValueError('Each token needs string "name" and "sha256" fields')
+            name, scopes, expires_at = entry["name"], entry.get("scopes", []), entry.get("expires_at")
+            if not isinstance(scopes, list) or not all(isinstance(scope, str) for scope in scopes):
+                raise ValueError(f'Token {name!r}: "scopes" must be a list of strings')
+            if expires_at is not None and not isinstance(expires_at, str):
+                raise ValueError(f'Token {name!r}: "expires_at" must be an ISO 8601 string')
+            digest = bytes.fromhex(entry["sha256"])
+            if len(digest) != hashlib.sha256().digest_size:
+                raise ValueError(f"Token {name!r} has an invalid sha256 digest")
+            tokens[digest] = TokenInfo(
+                name=name,
+                digest=digest,
+                scopes=frozenset(scopes),
+                expires_at=_parse_expiry(expires_at),
+            )
+        return tokens
+
+    def reload(self) -> None:
+        """Re-read the token file (or the demo token) and swap in the new set."""
+        mtime_ns = self.path.stat().st_mtime_ns if self.path else None
+        self._tokens = self._load()
+        self._mtime_ns = mtime_ns
+        logger.info("Loaded auth tokens", extra={"count": len(self._tokens)})
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self.path is None or now < self._next_check:
+            return
+        self._next_check = now + self.reload_seconds
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError as e:
+            logger.error("Could not stat auth token file, keeping previous set: %s", e)
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            self.reload()
+        except Exception as e:
+            # Never fail a request over a bad file, and don't re-parse it until it changes
+            self._mtime_ns = mtime_ns
+            logger.error("Could not reload auth tokens, keeping previous set: %s", e)
+
+    def lookup(self, token: str) -> Optional[TokenInfo]:
+        """The unexpired token matching `token`, or None."""
+        self._maybe_reload()
+        digest = hash_token(token)
+        info = self._tokens.get(digest)
+        if info is None or not hmac.compare_digest(info.digest, digest):
+            return None
+        if info.expires_at is not None and info.expires_at <= time.time():
+            return None
+        return info
+
+token_store = TokenStore(TOKENS_FILE, demo_token=None if TOKENS_FILE else DEMO_TOKEN)
+
+def _authenticate(credentials: HTTPAuthorizationCredentials, scope: Optional[str]) -> str:
+    with phase("auth"):
+        info = token_store.lookup(credentials.credentials)
+        if info is None:
+            raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+        if scope is not None and not info.allows(scope):
+            raise HTTPException(status_code=403, detail=f"Token lacks scope '{scope}'")
+        return info.name
+
+async def verify_bearer(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    """Any valid token; returns the token's name (async: no threadpool hop)."""
+    return _authenticate(credentials, None)
+
+def require_scope(scope: str):
+    """
+    Dependency accepting tokens with `scope`. Create it once per router so
+    FastAPI runs it only once per request.
+    """
+    async def verify_scoped_bearer(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+        return _authenticate(credentials, scope)
+    return verify_scoped_bearer
 
-def verify_bearer(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    token = credentials.credentials
-    if token != DEMO_TOKEN:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    return token
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m api_service.app.core.auth <name> [scope ...]")
+        sys.exit(1)
+    token = secrets.token_urlsafe(32)
+    entry = {"name": sys.argv[1], "sha256": hash_token(token).hex(), "scopes": sys.argv[2:] or [ALL_SCOPES]}
+    print(f"token: {token}")
+    print(f"entry: {json.dumps(entry)}")
@@ -0,0 +1,67 @@
+import os
+from collections.abc import Iterable, Mapping
+import numpy as np
+
+# Laps of history kept per session; older laps are overwritten.
+HISTORY_LAPS = int(os.getenv("LAP_HISTORY_LAPS", "256"))
+
+class LapHistory:
+    """
+    Fixed-size per-session lap history: a preallocated ring buffer with one
+    column per field, indexed by `lap % capacity`.
+
+    `columns` maps field names to dtypes (a plain sequence of names means
+    float64 for all), so counts stay exact integers and values come back as
+    they were recorded. Memory is allocated once at session init and never
+    grows, however many laps are recorded (about capacity * (8 + the item
+    sizes of the columns) bytes).
+    """
+
+    __slots__ = ("columns", "capacity", "latest", "_laps", "_values")
+
+    def __init__(self, columns: Mapping[str, np.dtype] | Iterable[str], capacity: int = HISTORY_LAPS):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least one lap")
+        if not isinstance(columns, Mapping):
+            columns = dict.fromkeys(columns, np.float64)
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.latest: int | None = None
+        self._laps = np.full(capacity, -1, dtype=np.int64)
+        self._values = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return self._laps.nbytes + sum(column.nbytes for column in self._values.values())
+
+    def record(self, laps, **values) -> None:
+        """Store values for one lap or an array of laps, overwriting earlier values for the same laps."""
+        laps = np.atleast_1d(np.asarray(laps, dtype=np.int64))
+        if laps.size == 0:
+            return
+        latest = int(laps.max()) if self.latest is None else max(self.latest, int(laps.max()))
+        # Laps that already fell out of the window would overwrite newer ones
+        keep = laps > latest - self.capacity
+        slots = laps[keep] % self.capacity
+
+        self._laps[slots] = laps[keep]
+        for name, column in self._values.items():
+            new = np.broadcast_to(np.asarray(values[name], dtype=column.dtype), laps.shape)
+            column[slots] = new[keep]
+        self.latest = latest
+
+    def range(self, lap_from: int | None = None, lap_to: int | None = None) -> dict[str, list]:
+        """Recorded laps in [lap_from, lap_to] as columns: {"laps": [...], <column>: [...]}."""
+        empty = {"laps": [], **{name: [] for name in self.columns}}
+        if self.latest is None:
+            return empty
+        hi = self.latest if lap_to is None else min(lap_to, self.latest)
+        lo = max(hi - self.capacity + 1, 0 if lap_from is None else lap_from, 0)
+        if hi < lo:
+            return empty
+
+        wanted = np.arange(lo, hi + 1, dtype=np.int64)
+        slots = wanted % self.capacity
+        present = self._laps[slots] == wanted
+        slots = slots[present]
+        return {"laps": wanted[present].tolist(), **{name: column[slots].tolist() for name, column in self._values.items()}}
@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+from fastapi import HTTPException
+from serving.registry import ModelNotFoundError, ModelRef, ModelRegistry
+
+# Versioned model artifacts, one namespace directory per router:
+#   api_service/models/<router>/<model_name>/<version>.json
+MODELS_DIR = Path(os.getenv("MODELS_DIR", Path(__file__).resolve().parents[2] / "models"))
+
+registry = ModelRegistry(MODELS_DIR)
+
+def resolve_model(namespace: str, model_name: str) -> ModelRef:
+    """Resolve a request's model_name to a pinned artifact, or 404."""
+    try:
+        return registry.resolve(model_name, namespace)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -3,6 +3,9 @@ from fastapi.responses import JSONResponse
 from .routers import laptime_forecasting, tyre_degradation, yellow_flag
 
 from .core.logging_config import setup_logging
+from .core.models import registry
+from serving.admission import admission_metrics
+from serving.profiling import install_profiling
 import uuid
 import logging
 import time
@@ -32,6 +35,11 @@ def create_app() -> FastAPI:
        # Readiness probe (checks dependencies before serving traffic)
         return {"ok": True}
 
+    @app.get("/metrics")
+    def metrics():
+        # Admission control counters per route and model registry stats
+        return {"admission": admission_metrics(), "models": registry.stats()}
+
     # Basic error handler to avoid leaking stack traces
     @app.exception_handler(Exception)
     async def generic_exception_handler(request: Request, exc: Exception):
@@ -58,6 +66,9 @@ def create_app() -> FastAPI:
         )
         return response
 
+    # Opt-in per-request profiling (PROFILING_ENABLED); must come after all routes
+    install_profiling(app)
+
     return app
 
 app = create_app()
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
 from pydantic import BaseModel, Field
-from ..core.auth import verify_bearer
+from serving.registry import ModelRef
+from ..core.auth import require_scope
+from ..core.history import LapHistory
+from ..core.models import registry, resolve_model
+from serving.admission import admission_guard
 import random, asyncio
 
 # Router for lap time forecasting endpoints
@@ -23,20 +27,41 @@ class LapTimePrediction(BaseModel):
     pred_interval_5: list[float]
     pred_interval_95: list[float]
 
+# Per-lap history of the latest forecast for each lap, one column per field
+class LapTimeHistory(BaseModel):
+    request_id: str
+    laps: list[int]
+    predictions: list[float]
+    pred_interval_5: list[float]
+    pred_interval_95: list[float]
+
+HISTORY_COLUMNS = ("predictions", "pred_interval_5", "pred_interval_95")
+
 # In-memory store to keep track of request state
 _lap_state: dict[str, int] = {}
+# Model version pinned per request_id at init
+_lap_models: dict[str, ModelRef] = {}
+# Latest forecast per lap, fixed size per request_id
+_lap_history: dict[str, LapHistory] = {}
+
+MODEL_NAMESPACE = "laptime_forecasting"
+# Tokens need the "laptime_forecasting" scope (or "*")
+verify_token = require_scope(MODEL_NAMESPACE)
+DEFAULT_MODEL = "baseline"
 
 # Helper function to generate lap time predictions
-def _gen(start_lap: int, length: int = 15):
+def _gen(start_lap: int, length: int = 15, model: dict | None = None):
+    model = model or registry.get(DEFAULT_MODEL, MODEL_NAMESPACE)
     laps = list(range(start_lap, start_lap + length))
     future = list(range(start_lap + length, start_lap + length + 5))
 
     # TODO: Replace this random generator with real ML inference,
-    preds = [round(random.uniform(70, 120), 2) for _ in laps]
+    preds = [round(random.uniform(model["lap_time_min"], model["lap_time_max"]), 2) for _ in laps]
 
     # Confidence intervals
-    pred5 = [p - round(random.uniform(0.5, 1.0), 2) for p in preds]
-    pred95 = [p + round(random.uniform(0.5, 1.0), 2) for p in preds]
+    lo, hi = model["interval_min"], model["interval_max"]
+    pred5 = [p - round(random.uniform(lo, hi), 2) for p in preds]
+    pred95 = [p + round(random.uniform(lo, hi), 2) for p in preds]
 
     return LapTimePrediction(
         lapcount=laps,
@@ -48,18 +73,25 @@ def _gen(start_lap: int, length: int = 15):
 
 # Initialize a forecast session
 @router.post("/laptime_forecasting/init")
-def init_forecast(req: LapTimeRequest, _: str = Depends(verify_bearer)):
+def init_forecast(req: LapTimeRequest, _: str = Depends(verify_token)):
     """
     Initialize lap time forecasting for a given model/event/car/year.
     Returns a request_id that must be used in subsequent GET calls.
     """
+    ref = resolve_model(MODEL_NAMESPACE, req.model_name)
     rid = f"{req.model_name}_{req.event_name}_{req.car_no}_{req.year}"
     _lap_state[rid] = 1
+    _lap_models[rid] = ref
+    _lap_history[rid] = LapHistory(HISTORY_COLUMNS)
     return {"request_id": rid, "status": "initialized"}
 
 # Get the next set of predictions
-@router.get("/laptime_forecasting/predict", response_model=LapTimePrediction)
-def get_forecast(request_id: str, _: str = Depends(verify_bearer)):
+@router.get(
+    "/laptime_forecasting/predict",
+    response_model=LapTimePrediction,
+    dependencies=[Depends(admission_guard("laptime_forecasting", verify_token))],
+)
+def get_forecast(request_id: str, _: str = Depends(verify_token)):
     """
     Generate predictions for the next laps. Requires a valid request_id.
     """
@@ -69,7 +101,33 @@ def get_forecast(request_id: str, _: str = Depends(verify_bearer)):
         detail=f"Invalid request ID '{request_id}'. You must first call POST /v1/laptime_forecasting/init to get a request_id.."
     )
     _lap_state[request_id] += 1
-    return _gen(_lap_state[request_id])
+    forecast = _gen(_lap_state[request_id], model=registry.get(_lap_models[request_id]))
+    _lap_history[request_id].record(
+        forecast.lapcount,
+        predictions=forecast.predictions,
+        pred_interval_5=forecast.pred_interval_5,
+        pred_interval_95=forecast.pred_interval_95,
+    )
+    return forecast
+
+@router.get("/laptime_forecasting/history", response_model=LapTimeHistory)
+def get_forecast_history(
+    request_id: str,
+    lap_from: int | None = Query(None, ge=0),
+    lap_to: int | None = Query(None, ge=0),
+    _: str = Depends(verify_token),
+):
+    """
+    Latest forecast for each lap in a range of this session, as columnar arrays.
+    Only the most recent LAP_HISTORY_LAPS laps are kept.
+    """
+    if request_id not in _lap_history:
+        raise HTTPException(
+        status_code=400,
+        detail=f"Invalid request ID '{request_id}'. You must first call POST /v1/laptime_forecasting/init to get a request_id.."
+    )
+    history = _lap_history[request_id]
+    return LapTimeHistory(request_id=request_id, **history.range(lap_from, lap_to))
 
 # WebSocket endpoint to stream lap predictions live
 @router.websocket("/laptime_forecasting/ws")
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from ..core.auth import verify_bearer
+from ..core.auth import require_scope
+from ..core.history import LapHistory
+from ..core.models import registry, resolve_model
+from serving.admission import admission_guard
+import numpy as np
 import random
 
 # Router for tyre degradation endpoints
@@ -23,25 +27,42 @@ class TyrePrediction(BaseModel):
     recommendation: str
     pitstops: list[int]
 
+# Per-lap history, one column per field
+class TyreHistory(BaseModel):
+    request_id: str
+    laps: list[int]
+    wear: list[float]
+
 # In-memory state keyed by request_id
 _tyre_state: dict[str, dict] = {}
 
-# Constants for demo simulation
-WEAR_RATE = 0.02         # 2% wear per lap (placeholder for real model)
-PITSTOP_INTERVAL = 20    # Every 20 laps for demo
+MODEL_NAMESPACE = "tyre_degradation"
+# Upper bound on laps advanced per predict call
+MAX_STINT_LAPS = 500
+# Tokens need the "tyre_degradation" scope (or "*")
+verify_token = require_scope(MODEL_NAMESPACE)
 
 @router.post("/tyre_degradation/init")
-def init_tyres(req: TyreRequest, _: str = Depends(verify_bearer)):
+def init_tyres(req: TyreRequest, _: str = Depends(verify_token)):
     """
     Initialize tyre degradation tracking for a car/session.
     Returns request_id for subsequent predictions.
     """
+    ref = resolve_model(MODEL_NAMESPACE, req.model_name)
     rid = f"{req.model_name}_{req.event_name}_{req.car_no}_{req.year}"
-    _tyre_state[rid] = {"lap_start": 1, "lap_end": 1}
+    _tyre_state[rid] = {"lap_start": 1, "lap_end": 1, "model": ref, "history": LapHistory(("wear",))}
     return {"request_id": rid, "status": "initialized"}
 
-@router.get("/tyre_degradation/predict", response_model=TyrePrediction)
-def predict_tyres(request_id: str, laps: int = 5, _: str = Depends(verify_bearer)):
+@router.get(
+    "/tyre_degradation/predict",
+    response_model=TyrePrediction,
+    dependencies=[Depends(admission_guard("tyre_degradation", verify_token))],
+)
+def predict_tyres(
+    request_id: str,
+    laps: int = Query(5, gt=0, le=MAX_STINT_LAPS, description="Laps to advance"),
+    _: str = Depends(verify_token),
+):
     """
     Simulate tyre wear progression over the next few laps.
     TODO: Replace with real ML model inference and persist to DB.
@@ -54,16 +75,21 @@ def predict_tyres(request_id: str, laps: int = 5, _: str = Depends(verify_bearer
 
     # Update lap range for this request
     state = _tyre_state[request_id]
+    model = registry.get(state["model"])
     state["lap_start"] = state["lap_end"]
     state["lap_end"] += laps
 
-    # Simulated wear progression
-    wear = min(1.0, state.get("wear", 0) + WEAR_RATE * laps)
+    # Simulated wear progression, lap by lap; only the laps the history keeps
+    history = state["history"]
+    offsets = np.arange(max(1, laps - history.capacity + 1), laps + 1)
+    lap_wear = np.minimum(1.0, state.get("wear", 0) + model["wear_rate"] * offsets)
+    history.record(state["lap_start"] + offsets, wear=np.round(lap_wear, 3))
+    wear = min(1.0, state.get("wear", 0) + model["wear_rate"] * laps)
     state["wear"] = wear
-    note = "Pit soon" if wear > 0.75 else "OK"
+    note = "Pit soon" if wear > model["pit_threshold"] else "OK"
 
-    # Fake pit stops (hardcoded interval for demo purposes)
-    pitstops = list(range(PITSTOP_INTERVAL, 100, PITSTOP_INTERVAL))
+    # Fake pit stops (fixed interval from the model for demo purposes)
+    pitstops = list(range(model["pitstop_interval"], 100, model["pitstop_interval"]))
 
     return TyrePrediction(
         lap_start=state["lap_start"],
@@ -72,3 +98,22 @@ def predict_tyres(request_id: str, laps: int = 5, _: str = Depends(verify_bearer
         recommendation=note,
         pitstops=pitstops
     )
+
+@router.get("/tyre_degradation/history", response_model=TyreHistory)
+def tyre_history(
+    request_id: str,
+    lap_from: int | None = Query(None, ge=0),
+    lap_to: int | None = Query(None, ge=0),
+    _: str = Depends(verify_token),
+):
+    """
+    Per-lap wear for a lap range of this session, as columnar arrays.
+    Only the most recent LAP_HISTORY_LAPS laps are kept.
+    """
+    if request_id not in _tyre_state:
+        raise HTTPException(
+        status_code=400,
+        detail=f"Invalid request ID '{request_id}'. You must first call POST /v1/tyre_degradation/init to get a request_id.."
+    )
+    history = _tyre_state[request_id]["history"]
+    return TyreHistory(request_id=request_id, **history.range(lap_from, lap_to))
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from ..core.auth import verify_bearer
+from serving.registry import ModelRef
+from ..core.auth import require_scope
+from ..core.history import LapHistory
+from ..core.models import registry, resolve_model
+from serving.admission import admission_guard
+import numpy as np
 import random
 
 # Router for yellow flag probability endpoints
 router = APIRouter()
 
+# Upper bound for the count inputs; the score saturates long before this
+MAX_COUNT = 1000
+
 # Input schema
 class YellowFlagRequest(BaseModel):
     model_name: str
     event_name: str
     year: int = Field(gt=2000)
-    incidents_last_10: int = Field(ge=0, description="Number of incidents in last 10 laps")
+    incidents_last_10: int = Field(ge=0, le=MAX_COUNT, description="Number of incidents in last 10 laps")
     rain_probability: float = Field(ge=0, le=1, description="Probability of rain (0..1)")
-    safety_car_history: int = Field(ge=0, description="Number of prior safety car deployments")
+    safety_car_history: int = Field(ge=0, le=MAX_COUNT, description="Number of prior safety car deployments")
 
 # Output schema
 class YellowFlagPrediction(BaseModel):
@@ -21,31 +29,57 @@ class YellowFlagPrediction(BaseModel):
     score: float
     recommendation: str
 
+# Per-lap history, one column per field
+class YellowFlagHistory(BaseModel):
+    request_id: str
+    laps: list[int]
+    score: list[float]
+    incidents_last_10: list[int]
+    rain_probability: list[float]
+    safety_car_history: list[int]
+
+HISTORY_COLUMNS = {
+    "score": np.float64,
+    "incidents_last_10": np.int64,
+    "rain_probability": np.float64,
+    "safety_car_history": np.int64,
+}
+
 # In-memory state keyed by request_id
 _yellow_flag_state: dict[str, int] = {}
+# Model version pinned per request_id at init
+_yellow_flag_models: dict[str, ModelRef] = {}
+# Scores and inputs per lap, fixed size per request_id
+_yellow_flag_history: dict[str, LapHistory] = {}
 
-# Weights for the demo scoring model
-INCIDENT_WEIGHT = 0.05
-RAIN_WEIGHT = 0.6
-SAFETY_CAR_WEIGHT = 0.03
+MODEL_NAMESPACE = "yellow_flag"
+# Tokens need the "yellow_flag" scope (or "*")
+verify_token = require_scope(MODEL_NAMESPACE)
 
 @router.post("/yellow_flag/init")
-def init_yellow_flag(req: YellowFlagRequest, _: str = Depends(verify_bearer)):
+def init_yellow_flag(req: YellowFlagRequest, _: str = Depends(verify_token)):
     """
     Initialize yellow flag scoring for a given session.
     Returns a request_id to use for predictions.
     """
+    ref = resolve_model(MODEL_NAMESPACE, req.model_name)
     rid = f"{req.model_name}_{req.event_name}_{req.year}"
     _yellow_flag_state[rid] = 1
+    _yellow_flag_models[rid] = ref
+    _yellow_flag_history[rid] = LapHistory(HISTORY_COLUMNS)
     return {"request_id": rid, "status": "initialized"}
 
-@router.get("/yellow_flag/predict", response_model=YellowFlagPrediction)
+@router.get(
+    "/yellow_flag/predict",
+    response_model=YellowFlagPrediction,
+    dependencies=[Depends(admission_guard("yellow_flag", verify_token))],
+)
 def predict_yellow_flag(
     request_id: str,
-    incidents_last_10: int,
-    rain_probability: float,
-    safety_car_history: int,
-    _: str = Depends(verify_bearer)
+    incidents_last_10: int = Query(ge=0, le=MAX_COUNT),
+    rain_probability: float = Query(ge=0, le=1),
+    safety_car_history: int = Query(ge=0, le=MAX_COUNT),
+    _: str = Depends(verify_token)
 ):
     """
     Compute a simple probability score for a yellow flag event.
@@ -61,18 +95,46 @@ def predict_yellow_flag(
     _yellow_flag_state[request_id] += 1
     lap = _yellow_flag_state[request_id]
 
-    # Weighted demo formula
+    # Weighted demo formula (weights come from the session's model)
+    model = registry.get(_yellow_flag_models[request_id])
     score = (
-        INCIDENT_WEIGHT * incidents_last_10
-        + RAIN_WEIGHT * rain_probability
-        + SAFETY_CAR_WEIGHT * safety_car_history
+        model["incident_weight"] * incidents_last_10
+        + model["rain_weight"] * rain_probability
+        + model["safety_car_weight"] * safety_car_history
     )
     score = min(score, 1.0)
 
-    recommendation = "High risk of yellow flag" if score > 0.7 else "Low risk"
+    recommendation = "High risk of yellow flag" if score > model["high_risk_threshold"] else "Low risk"
+    score = round(score, 3)  # history returns exactly what the response does
+    _yellow_flag_history[request_id].record(
+        lap,
+        score=score,
+        incidents_last_10=incidents_last_10,
+        rain_probability=rain_probability,
+        safety_car_history=safety_car_history,
+    )
 
     return YellowFlagPrediction(
         lap=lap,
-        score=round(score, 3),
+        score=score,
         recommendation=recommendation
     )
+
+@router.get("/yellow_flag/history", response_model=YellowFlagHistory)
+def yellow_flag_history(
+    request_id: str,
+    lap_from: int | None = Query(None, ge=0),
+    lap_to: int | None = Query(None, ge=0),
+    _: str = Depends(verify_token),
+):
+    """
+    Per-lap scores and inputs for a lap range of this session, as columnar arrays.
+    Only the most recent LAP_HISTORY_LAPS laps are kept.
+    """
+    if request_id not in _yellow_flag_history:
+        raise HTTPException(
+        status_code=400,
+        detail=f"Invalid request ID '{request_id}'. You must first call POST /v1/yellow_flag/init to get a request_id.."
+    )
+    history = _yellow_flag_history[request_id]
+    return YellowFlagHistory(request_id=request_id, **history.range(lap_from, lap_to))
@@ -0,0 +1,126 @@
+"""
+Benchmark the per-request cost of bearer auth.
+
+Usage:
+    python -m api_service.benchmark --requests 5000 --concurrency 32 --tokens 1000
+
+Compares the previous sync `token != DEMO_TOKEN` dependency (run by FastAPI
+in the threadpool) with the async hashed-token `verify_bearer`, loaded with
+`--tokens` tokens. Each is timed as a bare function call and end to end
+through the ASGI app. The auth cost is the latency over an unauthenticated
+route.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from tabulate import tabulate
+
+from api_service.app.core import auth
+
+TOKEN = "benchmark-token"
+
+
+def legacy_verify_bearer(credentials: HTTPAuthorizationCredentials = Depends(auth.security)) -> str:
+    """The verifier before hashed tokens: one token, `!=`, sync (threadpool)."""
+    token = credentials.credentials
+    if token != TOKEN:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return token
+
+
+def _token_file(n_tokens: int) -> Path:
+    entries = [{"name": f"t{i}", "sha256": auth.hash_token(f"token-{i}").hex(), "scopes": ["*"]} for i in range(n_tokens - 1)]
+    entries.append({"name": "bench", "sha256": auth.hash_token(TOKEN).hex(), "scopes": ["*"]})
+    path = Path(tempfile.mkdtemp()) / "tokens.json"
+    path.write_text(json.dumps({"tokens": entries}))
+    return path
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/none")
+    async def no_auth():
+        return {"ok": True}
+
+    @app.get("/legacy")
+    async def legacy(_: str = Depends(legacy_verify_bearer)):
+        return {"ok": True}
+
+    @app.get("/hashed")
+    async def hashed(_: str = Depends(auth.verify_bearer)):
+        return {"ok": True}
+
+    return app
+
+
+def _call_cost(fn, repeat: int) -> float:
+    """Best-of-5 mean seconds per call."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+async def _latency(client: httpx.AsyncClient, path: str, n: int, concurrency: int) -> float:
+    """Median seconds per request with `concurrency` requests in flight."""
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    batches = []
+    for _ in range(max(1, n // concurrency)):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(path, headers=headers) for _ in range(concurrency)))
+        batches.append((time.perf_counter() - start) / concurrency)
+        assert all(r.status_code == 200 for r in responses), responses[0].text
+    return statistics.median(batches)
+
+
+async def _end_to_end(n: int, concurrency: int) -> dict[str, float]:
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/none", "/legacy", "/hashed"):  # warm up
+            await _latency(client, path, concurrency * 4, concurrency)
+        return {path: await _latency(client, path, n, concurrency) for path in ("/none", "/legacy", "/hashed")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=1_000, help="tokens in the hashed token file")
+    args = parser.parse_args()
+
+    logging.getLogger(auth.__name__).setLevel(logging.WARNING)
+    auth.token_store = auth.TokenStore(_token_file(args.tokens))
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=TOKEN)
+
+    legacy_call = _call_cost(lambda: legacy_verify_bearer(creds), 100_000)
+    hashed_call = _call_cost(lambda: auth._authenticate(creds, "yellow_flag"), 100_000)
+    latency = asyncio.run(_end_to_end(args.requests, args.concurrency))
+
+    def us(seconds: float) -> str:
+        return f"{seconds * 1e6:.1f}"
+
+    table = [
+        ["none", "-", us(latency["/none"]), "-"],
+        ["legacy (sync, !=)", us(legacy_call), us(latency["/legacy"]), us(latency["/legacy"] - latency["/none"])],
+        [f"hashed (async, {args.tokens} tokens)", us(hashed_call), us(latency["/hashed"]),
+         us(latency["/hashed"] - latency["/none"])],
+    ]
+    print(f"{args.requests:,} requests, concurrency {args.concurrency}")
+    print(tabulate(table, headers=["auth", "call µs", "request µs", "auth cost µs/request"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# api_service/tests/auth_test.py
+import json
+import os
+import pytest
+from fastapi.testclient import TestClient
+from api_service.app.core import auth
+from api_service.app.main import app
+
+client = TestClient(app)
+
+def _entry(name, token, scopes, expires_at=None):
+    entry = {"name": name, "sha256": auth.hash_token(token).hex(), "scopes": scopes}
+    if expires_at:
+        entry["expires_at"] = expires_at
+    return entry
+
+def _write(path, *entries):
+    path.write_text(json.dumps({"tokens": list(entries)}))
+    # make sure the change is visible even on coarse mtime filesystems
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+@pytest.fixture
+def token_file(tmp_path, monkeypatch):
+    path = tmp_path / "tokens.json"
+    _write(
+        path,
+        _entry("yellow", "yellow-token", ["yellow_flag"]),
+        _entry("admin", "admin-token", ["*"]),
+        _entry("old", "old-token", ["*"], expires_at="2020-01-01T00:00:00Z"),
+    )
+    monkeypatch.setattr(auth, "token_store", auth.TokenStore(path, reload_seconds=0))
+    return path
+
+def _init_yellow(token):
+    return client.post("/v1/yellow_flag/init", json={
+        "model_name": "baseline",
+        "event_name": "Monaco",
+        "year": 2024,
+        "incidents_last_10": 0,
+        "rain_probability": 0.0,
+        "safety_car_history": 0
+    }, headers={"Authorization": f"Bearer {token}"})
+
+def test_scopes_and_expiry(token_file):
+    assert _init_yellow("yellow-token").status_code == 200
+    assert _init_yellow("admin-token").status_code == 200
+
+    r = client.get("/v1/tyre_degradation/history?request_id=x", headers={"Authorization": "Bearer yellow-token"})
+    assert r.status_code == 403
+
+    r = _init_yellow("old-token")
+    assert r.status_code == 401
+    assert r.headers["WWW-Authenticate"] == "Bearer"
+    assert _init_yellow("mysecrettoken").status_code == 401
+
+def test_token_file_reloads_without_restart(token_file):
+    assert _init_yellow("new-token").status_code == 401
+    _write(token_file, _entry("new", "new-token", ["yellow_flag"]))
+    assert _init_yellow("new-token").status_code == 200
+    assert _init_yellow("admin-token").status_code == 401  # revoked
+
+def test_broken_token_file_keeps_previous_tokens(token_file):
+    token_file.write_text("{not json")
+    os.utime(token_file, ns=(0, token_file.stat().st_mtime_ns + 2_000_000))
+    assert _init_yellow("admin-token").status_code == 200
+
+@pytest.mark.parametrize("contents", [
+    {"tokens": None},
+    {"tokens": [{"name": "x", "sha256": "00" * 32, "expires_at": 1893456000}]},
+    {"tokens": [{"name": "x", "sha256": "00" * 32, "scopes": "yellow_flag"}]},
+    {"tokens": [{"name": 7, "sha256": "00" * 32}]},
+    {"tokens": ["not-an-object"]},
+    ["not", "an", "object"],
+])
+def test_token_file_with_bad_field_types_keeps_previous_tokens(token_file, contents):
+    token_file.write_text(json.dumps(contents))
+    os.utime(token_file, ns=(0, token_file.stat().st_mtime_ns + 2_000_000))
+    assert _init_yellow("admin-token").status_code == 200
+    assert _init_yellow("admin-token").status_code == 200
+
+def test_demo_token_without_file():
+    store = auth.TokenStore(demo_token="demo-secret")
+    info = store.lookup("demo-secret")
+    assert info is not None and info.allows("anything")
+    assert store.lookup("demo-secreT") is None
@@ -0,0 +1,38 @@
+# api_service/tests/history_test.py
+import numpy as np
+import pytest
+from api_service.app.core.history import LapHistory
+
+def test_history_keeps_column_dtypes_exact():
+    h = LapHistory({"count": np.int64, "score": np.float64}, capacity=4)
+    h.record(1, count=16_777_217, score=0.191)
+    assert h.range() == {"laps": [1], "count": [16_777_217], "score": [0.191]}
+    assert isinstance(h.range()["count"][0], int)
+    assert h.nbytes == 4 * (8 + 8 + 8)
+
+def test_history_range_returns_columns():
+    h = LapHistory(("wear", "score"), capacity=8)
+    h.record([1, 2, 3], wear=[0.1, 0.2, 0.3], score=0.5)
+    assert h.range() == {"laps": [1, 2, 3], "wear": [0.1, 0.2, 0.3], "score": [0.5, 0.5, 0.5]}
+    assert h.range(2, 2) == {"laps": [2], "wear": [0.2], "score": [0.5]}
+    assert h.range(5, 9)["laps"] == []
+
+def test_history_wraps_with_fixed_memory():
+    h = LapHistory(("wear",), capacity=8)
+    size = h.nbytes
+    for lap in range(1, 101):
+        h.record(lap, wear=lap / 100)
+    assert h.nbytes == size
+    assert h.range()["laps"] == list(range(93, 101))
+    assert h.range(0, 95)["laps"] == [93, 94, 95]
+
+def test_history_ignores_laps_outside_window():
+    h = LapHistory(("wear",), capacity=4)
+    h.record(range(1, 11), wear=1.0)
+    h.record(2, wear=0.0)  # older than the window, must not clobber lap 10
+    assert h.range() == {"laps": [7, 8, 9, 10], "wear": [1.0] * 4}
+
+def test_history_empty_and_invalid():
+    assert LapHistory(("wear",)).range() == {"laps": [], "wear": []}
+    with pytest.raises(ValueError):
+        LapHistory(("wear",), capacity=0)
@@ -24,3 +24,22 @@ def test_laptime_forecasting_flow():
     j = r.json()
     assert "predictions" in j and isinstance(j["predictions"], list)
     assert len(j["predictions"]) > 0 
+
+def test_laptime_forecasting_history():
+    init = client.post("/v1/laptime_forecasting/init", json={
+        "model_name": "baseline",
+        "event_name": "Suzuka",
+        "year": 2024,
+        "car_no": 28,
+        "n_in": 5,
+        "n_out": 5
+    }, headers=AUTH)
+    rid = init.json()["request_id"]
+    client.get(f"/v1/laptime_forecasting/predict?request_id={rid}", headers=AUTH)
+    latest = client.get(f"/v1/laptime_forecasting/predict?request_id={rid}", headers=AUTH).json()
+
+    h = client.get(f"/v1/laptime_forecasting/history?request_id={rid}&lap_from=3", headers=AUTH).json()
+    # Overlapping laps hold the most recent forecast
+    assert h["laps"] == latest["lapcount"]
+    assert h["predictions"] == latest["predictions"]
+    assert h["pred_interval_95"] == latest["pred_interval_95"]
@@ -1,6 +1,7 @@
 # api_service/tests/test_tyre_degradation.py
 from fastapi.testclient import TestClient
 from api_service.app.main import app
+from api_service.app.core.history import HISTORY_LAPS
 
 client = TestClient(app)
 AUTH = {"Authorization": "Bearer mysecrettoken"}
@@ -31,3 +32,60 @@ def test_tyre_degradation_flow():
     # validate values
     assert 0 <= j["wear_after_stint"] <= 1
     assert j["recommendation"] in ["OK", "Pit soon"]
+
+def test_tyre_degradation_unknown_model():
+    r = client.post("/v1/tyre_degradation/init", json={
+        "model_name": "no_such_model",
+        "event_name": "Toronto",
+        "year": 2024,
+        "car_no": 27,
+        "n_laps": 10,
+        "initial_wear": 0.2
+    }, headers=AUTH)
+    assert r.status_code == 404
+
+def test_tyre_degradation_history():
+    init = client.post("/v1/tyre_degradation/init", json={
+        "model_name": "baseline",
+        "event_name": "Suzuka",
+        "year": 2024,
+        "car_no": 27,
+        "n_laps": 10,
+        "initial_wear": 0.2
+    }, headers=AUTH)
+    rid = init.json()["request_id"]
+    client.get(f"/v1/tyre_degradation/predict?request_id={rid}&laps=5", headers=AUTH)
+    last = client.get(f"/v1/tyre_degradation/predict?request_id={rid}&laps=3", headers=AUTH).json()
+
+    h = client.get(f"/v1/tyre_degradation/history?request_id={rid}", headers=AUTH).json()
+    assert h["laps"] == list(range(2, 10))
+    assert h["wear"] == sorted(h["wear"])
+    assert h["wear"][-1] == last["wear_after_stint"]
+
+    # lap range
+    h = client.get(f"/v1/tyre_degradation/history?request_id={rid}&lap_from=4&lap_to=6", headers=AUTH).json()
+    assert h["laps"] == [4, 5, 6] and len(h["wear"]) == 3
+
+    r = client.get("/v1/tyre_degradation/history?request_id=nope", headers=AUTH)
+    assert r.status_code == 400
+
+def test_tyre_degradation_laps_bounded():
+    init = client.post("/v1/tyre_degradation/init", json={
+        "model_name": "baseline",
+        "event_name": "Spa",
+        "year": 2024,
+        "car_no": 27,
+        "n_laps": 10,
+        "initial_wear": 0.2
+    }, headers=AUTH)
+    rid = init.json()["request_id"]
+    for laps in (0, 20_000_000):
+        r = client.get(f"/v1/tyre_degradation/predict?request_id={rid}&laps={laps}", headers=AUTH)
+        assert r.status_code == 422
+
+    # A stint longer than the history keeps only its most recent laps
+    r = client.get(f"/v1/tyre_degradation/predict?request_id={rid}&laps=500", headers=AUTH)
+    assert r.status_code == 200
+    h = client.get(f"/v1/tyre_degradation/history?request_id={rid}", headers=AUTH).json()
+    assert h["laps"] == list(range(502 - HISTORY_LAPS, 502))
+    assert h["wear"][-1] == r.json()["wear_after_stint"]
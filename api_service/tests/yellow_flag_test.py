@@ -34,3 +34,47 @@ def test_yellow_flag_flow():
     # validate values
     assert isinstance(j["score"], float)
     assert 0 <= j["score"] <= 1
+
+def test_yellow_flag_history():
+    init = client.post("/v1/yellow_flag/init", json={
+        "model_name": "baseline",
+        "event_name": "Suzuka",
+        "year": 2024,
+        "incidents_last_10": 0,
+        "rain_probability": 0.0,
+        "safety_car_history": 0
+    }, headers=AUTH)
+    rid = init.json()["request_id"]
+    scores = []
+    for incidents in range(3):
+        r = client.get(
+            f"/v1/yellow_flag/predict?request_id={rid}&incidents_last_10={incidents}&rain_probability=0.4&safety_car_history=1",
+            headers=AUTH
+        )
+        scores.append(r.json()["score"])
+
+    h = client.get(f"/v1/yellow_flag/history?request_id={rid}", headers=AUTH).json()
+    assert h["laps"] == [2, 3, 4]
+    assert h["score"] == scores
+    assert h["incidents_last_10"] == [0, 1, 2]
+    assert h["rain_probability"] == [0.4, 0.4, 0.4]
+    assert h["safety_car_history"] == [1, 1, 1]
+
+def test_yellow_flag_predict_inputs_bounded():
+    init = client.post("/v1/yellow_flag/init", json={
+        "model_name": "baseline",
+        "event_name": "Spa",
+        "year": 2024,
+        "incidents_last_10": 0,
+        "rain_probability": 0.0,
+        "safety_car_history": 0
+    }, headers=AUTH)
+    rid = init.json()["request_id"]
+    for query in ("incidents_last_10=100000000000000000000&rain_probability=0&safety_car_history=0",
+                  "incidents_last_10=-1&rain_probability=0&safety_car_history=0",
+                  "incidents_last_10=0&rain_probability=1.5&safety_car_history=0"):
+        r = client.get(f"/v1/yellow_flag/predict?request_id={rid}&{query}", headers=AUTH)
+        assert r.status_code == 422
+
+    r = client.get(f"/v1/yellow_flag/history?request_id={rid}", headers=AUTH)
+    assert r.status_code == 200 and r.json()["laps"] == []
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query
+from pydantic import BaseModel
+
+from . import pipeline
+from .query import MAX_PAGE_SIZE, SummaryReader
+
+app = FastAPI(
+    title="Transaction Summary API",
+    version="1.0.0",
+    description="Indexed, keyset-paginated reads over the pipeline's transaction_summary table.",
+)
+
+_reader: Optional[SummaryReader] = None
+
+
+def get_reader() -> SummaryReader:
+    """Create the pooled reader on first use, against the pipeline's configured DB."""
+    global _reader
+    if _reader is None:
+        _reader = SummaryReader(pipeline.DB_URL)
+    return _reader
+
+
+class UserDay(BaseModel):
+    date: str
+    total_amount: float
+
+
+class UserCursor(BaseModel):
+    after: str
+
+
+class UserHistoryPage(BaseModel):
+    items: list[UserDay]
+    next: Optional[UserCursor]
+
+
+class SummaryRow(BaseModel):
+    date: str
+    user_id: str
+    total_amount: float
+
+
+class RangeCursor(BaseModel):
+    after_date: str
+    after_user: str
+
+
+class DateRangePage(BaseModel):
+    items: list[SummaryRow]
+    next: Optional[RangeCursor]
+
+
+class UserTotal(BaseModel):
+    user_id: str
+    total_amount: float
+
+
+def _iso(d: Optional[dt.date]) -> Optional[str]:
+    return d.isoformat() if d else None
+
+
+@app.get("/healthz")
+def health() -> dict:
+    return {"status": "ok"}
+
+
+@app.get("/users/{user_id}/summary", response_model=UserHistoryPage)
+def user_summary(
+    user_id: str,
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    after: Optional[dt.date] = Query(None, description="Cursor: `next.after` from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    reader: SummaryReader = Depends(get_reader),
+):
+    return reader.user_history(user_id, _iso(start), _iso(end), _iso(after), limit)
+
+
+@app.get("/summary", response_model=DateRangePage)
+def date_range_summary(
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    after_date: Optional[dt.date] = Query(None, description="Cursor: `next.after_date` from the previous page"),
+    after_user: Optional[str] = Query(None, description="Cursor: `next.after_user` from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    reader: SummaryReader = Depends(get_reader),
+):
+    if (after_date is None) != (after_user is None):
+        raise HTTPException(status_code=400, detail="`after_date` and `after_user` must be passed together.")
+    return reader.date_range(_iso(start), _iso(end), _iso(after_date), after_user, limit)
+
+
+@app.get("/users/top", response_model=list[UserTotal])
+def top_users(
+    n: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    reader: SummaryReader = Depends(get_reader),
+):
+    return reader.top_users(n, _iso(start), _iso(end))
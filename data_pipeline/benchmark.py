@@ -0,0 +1,86 @@
+"""
+Benchmark the daily aggregation engines used by `transform`.
+
+Usage:
+    python -m data_pipeline.benchmark --rows 5000000 --users 100000 --days 365
+
+Times the legacy `groupby(["user_id", date.dt.date])`, the pandas integer-key
+engine and the NumPy sort-based engine on the same cleaned frame, and checks
+that both engines reproduce the legacy result exactly.
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from data_pipeline import pipeline
+
+
+def make_transactions(rows: int, users: int, days: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic cleaned transactions (typed columns, as produced by `_clean`)."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2024-01-01T00:00:00", "s")
+    offsets = rng.integers(0, days * 86_400, rows).astype("timedelta64[s]")
+    return pd.DataFrame({
+        "user_id": pd.Index([f"u{i}" for i in range(users)]).take(rng.integers(0, users, rows)),
+        "date": pd.to_datetime(start + offsets),
+        "amount": np.round(rng.random(rows) * 500, 2),
+    })
+
+
+def _legacy(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby(["user_id", df["date"].dt.date])["amount"]
+        .sum()
+        .reset_index()
+        .rename(columns={"amount": "total_amount"})
+    )
+
+
+def _engine(name: str):
+    def run(df: pd.DataFrame) -> pd.DataFrame:
+        daily, users = pipeline._aggregate_daily(df, name)
+        return pipeline._daily_summary(daily, users)
+    return run
+
+
+def _best_of(fn, df: pd.DataFrame, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger(pipeline.__name__).setLevel(logging.WARNING)
+    df = make_transactions(args.rows, args.users, args.days)
+
+    baseline_s, expected = _best_of(_legacy, df, args.repeat)
+    table = [["legacy .dt.date groupby", f"{baseline_s:.3f}", "1.00x", "-"]]
+    for name in pipeline.AGG_ENGINES:
+        seconds, result = _best_of(_engine(name), df, args.repeat)
+        try:
+            pd.testing.assert_frame_equal(result, expected, check_exact=True)
+            match = "exact"
+        except AssertionError:
+            match = "MISMATCH"
+        table.append([f"engine={name}", f"{seconds:.3f}", f"{baseline_s / seconds:.2f}x", match])
+
+    print(f"{args.rows:,} rows, {args.users:,} users, {args.days} days (best of {args.repeat})")
+    print(tabulate(table, headers=["aggregation", "seconds", "speedup", "matches legacy"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
 import os
 import logging
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 
+from data_pipeline.query import (
+    LIFETIME_TABLE,
+    MONTHLY_TABLE,
+    SUMMARY_TABLE,
+    WEEKLY_TABLE,
+    create_indexes,
+)
+
 # Load config
 load_dotenv()
 DB_URL = os.getenv("DB_URL", "sqlite:///transactions.db")
 DATA_FILE = os.getenv("DATA_FILE", "sample_data.csv")
+TRANSFORM_ENGINE = os.getenv("TRANSFORM_ENGINE", "pandas")
 
 # Configure logging
 logging.basicConfig(
@@ -18,12 +28,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 REQUIRED_COLUMNS = {"user_id", "date", "amount"}
+AGG_ENGINES = ("pandas", "numpy")
+
+# IDs are labels, not numbers: never let a null turn "101" into "101.0".
+READ_DTYPES = {"user_id": str}
 
 def extract(file_path: str = DATA_FILE) -> pd.DataFrame:
     """Extract data from CSV into a DataFrame."""
     try:
         logger.info(f"Extracting data from {file_path}")
-        return pd.read_csv(file_path)
+        return pd.read_csv(file_path, dtype=READ_DTYPES)
     except Exception as e:
         logger.error(f"Failed to extract data: {e}")
         raise
@@ -43,31 +57,241 @@ def validate(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def transform(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean and aggregate transaction data."""
-    logger.info("Transforming data")
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop incomplete rows and cast columns to their working types."""
     df = df.dropna(subset=REQUIRED_COLUMNS)
     df["user_id"] = df["user_id"].astype(str)
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df["amount"] = pd.to_numeric(df["amount"], errors="coerce")
-    df = df.dropna(subset=["date", "amount"])
+    return df.dropna(subset=["date", "amount"])
+
+
+def _stable_argsort(key: np.ndarray) -> np.ndarray:
+    """
+    Stable argsort of non-negative int64 keys as an LSD radix sort.
+
+    NumPy only radix-sorts 16-bit integers (wider types fall back to timsort),
+    so sort one 16-bit digit at a time, least significant first.
+    """
+    order = np.argsort((key & 0xFFFF).astype(np.uint16), kind="stable")
+    for shift in range(16, int(key.max()).bit_length(), 16):
+        digit = ((key[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digit, kind="stable")]
+    return order
+
+
+def _kahan_group_sums(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Per-group Kahan sums of `sorted_values` (groups are contiguous runs).
+
+    Mirrors pandas' groupby `sum` loop exactly, but steps every group at once:
+    values are scattered into level-major order (all first elements, then all
+    second elements, ...) with groups sorted largest-first, so step r touches
+    a contiguous slice covering just the groups with more than r rows.
+    """
+    n_groups = len(starts)
+    by_size = np.argsort(-counts, kind="stable")
+    pos = np.empty(n_groups, dtype=np.int64)
+    pos[by_size] = np.arange(n_groups)
+
+    groups_at_least = np.bincount(counts)[::-1].cumsum()[::-1]
+    width = groups_at_least[1:]  # width[r]: number of groups with more than r rows
+    offset = np.r_[0, np.cumsum(width)[:-1]]
+
+    rank = np.arange(len(sorted_values)) - np.repeat(starts, counts)
+    levels = np.empty(len(sorted_values))
+    levels[offset[rank] + np.repeat(pos, counts)] = sorted_values
+
+    sums = np.zeros(n_groups)
+    compensation = np.zeros(n_groups)
+    for r, w in enumerate(width):
+        total, comp = sums[:w], compensation[:w]
+        y = levels[offset[r]:offset[r] + w] - comp
+        t = total + y
+        comp[:] = t - total - y
+        comp[np.isnan(comp)] = 0.0
+        total[:] = t
+    return sums[pos]
+
+
+def _group_sum_sorted(key: np.ndarray, values: np.ndarray):
+    """
+    Sum `values` per distinct `key` with a sort-based reduction.
+
+    Returns (group keys, sums, counts) ordered by key. Rows are grouped with a
+    stable sort so each group keeps its row order, which lets float sums
+    reproduce pandas' compensated groupby `sum` bit for bit. For groups of
+    one or two rows compensation never kicks in, so only groups of three or
+    more go through `_kahan_group_sums`.
+    """
+    order = _stable_argsort(key)
+    sorted_key = key[order]
+    starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+    counts = np.diff(np.r_[starts, len(key)])
+    sorted_values = values[order]
+    if not np.issubdtype(values.dtype, np.floating):
+        return sorted_key[starts], np.add.reduceat(sorted_values, starts), counts
+
+    # Overflow to inf/nan is propagated exactly as pandas does, without warnings.
+    with np.errstate(over="ignore", invalid="ignore"):
+        sums = np.add.reduceat(sorted_values, starts)
+        sums += 0.0  # pandas starts each group at +0.0, turning -0.0 sums into +0.0
+        big = counts >= 3
+        if big.any():
+            big_counts = counts[big]
+            big_starts = np.r_[0, np.cumsum(big_counts)[:-1]]
+            big_values = sorted_values[np.repeat(big, counts)]
+            sums[big] = _kahan_group_sums(big_values, big_starts, big_counts)
+    return sorted_key[starts], sums, counts
+
+
+def _aggregate_daily(df: pd.DataFrame, engine: str = "pandas") -> tuple[pd.DataFrame, pd.Index]:
+    """
+    Sum and count transactions per (user, day) on integer keys.
+
+    `user_id` is factorized once into sorted codes and dates are reduced to
+    day numbers (days since epoch); every rollup is derived from this frame.
+
+    engine="pandas" groups on the two integer columns; engine="numpy" packs
+    them into a single int64 key and reduces with `_group_sum_sorted`,
+    skipping pandas' groupby machinery. Both produce identical frames.
+    """
+    if engine not in AGG_ENGINES:
+        raise ValueError(f"Unknown aggregation engine {engine!r}; expected one of {AGG_ENGINES}")
+
+    user_codes, users = pd.factorize(df["user_id"], sort=True)
+    dates = df["date"]
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)  # local calendar day, as `.dt.date` gives
+    days = dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+    amounts = df["amount"].to_numpy()
+
+    if engine == "pandas" or len(days) == 0:
+        daily = (
+            pd.DataFrame({"user": user_codes, "day": days, "amount": amounts})
+            .groupby(["user", "day"])["amount"]
+            .agg(total_amount="sum", txn_count="count")
+            .reset_index()
+        )
+        return daily, users
+
+    first_day = days.min()
+    n_days = days.max() - first_day + 1
+    key = user_codes.astype(np.int64) * n_days + (days - first_day)
+    group_keys, totals, counts = _group_sum_sorted(key, amounts)
+    daily = pd.DataFrame({
+        "user": group_keys // n_days,
+        "day": group_keys % n_days + first_day,
+        "total_amount": totals,
+        "txn_count": counts,
+    })
+    return daily, users
 
-    # Aggregate
-    summary = (
-        df.groupby(["user_id", df["date"].dt.date])["amount"]
+
+def _as_dates(days) -> np.ndarray:
+    """Day numbers -> `datetime.date` objects (stored as ISO dates by SQLite)."""
+    return np.asarray(days, dtype="datetime64[D]").astype(object)
+
+
+def _rollup(daily: pd.DataFrame, users: pd.Index, period: pd.Series, column: str) -> pd.DataFrame:
+    rolled = (
+        daily.assign(period=period)
+        .groupby(["user", "period"])[["total_amount", "txn_count"]]
         .sum()
         .reset_index()
-        .rename(columns={"date": "date", "amount": "total_amount"})
     )
-    return summary
+    return pd.DataFrame({
+        "user_id": users.take(rolled["user"]),
+        column: _as_dates(rolled["period"]),
+        "total_amount": rolled["total_amount"].to_numpy(),
+        "txn_count": rolled["txn_count"].to_numpy(),
+    })
+
+
+def _daily_summary(daily: pd.DataFrame, users: pd.Index) -> pd.DataFrame:
+    return pd.DataFrame({
+        "user_id": users.take(daily["user"]),
+        "date": _as_dates(daily["day"]),
+        "total_amount": daily["total_amount"].to_numpy(),
+    })
+
+
+def transform(df: pd.DataFrame, engine: str | None = None) -> pd.DataFrame:
+    """Clean and aggregate transaction data."""
+    logger.info("Transforming data")
+    daily, users = _aggregate_daily(_clean(df), engine or TRANSFORM_ENGINE)
+    return _daily_summary(daily, users)
+
+
+def transform_rollups(df: pd.DataFrame, engine: str | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Clean and aggregate transaction data into every reporting granularity.
+
+    Returns a mapping of table name -> DataFrame: the daily summary plus
+    weekly (Monday-start) and monthly rollups and per-user lifetime totals.
+    The raw rows are aggregated once; coarser levels are rolled up from the
+    much smaller daily frame using the same integer keys. `engine` selects
+    the daily aggregation (see `_aggregate_daily`), defaulting to
+    TRANSFORM_ENGINE.
+    """
+    logger.info("Transforming data")
+    daily, users = _aggregate_daily(_clean(df), engine or TRANSFORM_ENGINE)
+
+    # 1970-01-01 was a Thursday, so (day + 3) % 7 is days since Monday.
+    week = daily["day"] - (daily["day"] + 3) % 7
+    month = (
+        daily["day"].to_numpy().astype("datetime64[D]")
+        .astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    )
+
+    lifetime = daily.groupby("user").agg(
+        total_amount=("total_amount", "sum"),
+        txn_count=("txn_count", "sum"),
+        first_date=("day", "min"),
+        last_date=("day", "max"),
+    )
+
+    return {
+        SUMMARY_TABLE: _daily_summary(daily, users),
+        WEEKLY_TABLE: _rollup(daily, users, week, "week_start"),
+        MONTHLY_TABLE: _rollup(daily, users, month, "month"),
+        LIFETIME_TABLE: pd.DataFrame({
+            "user_id": users.take(lifetime.index),
+            "total_amount": lifetime["total_amount"].to_numpy(),
+            "txn_count": lifetime["txn_count"].to_numpy(),
+            "first_date": _as_dates(lifetime["first_date"]),
+            "last_date": _as_dates(lifetime["last_date"]),
+        }),
+    }
 
-def load(df: pd.DataFrame, db_url: str = DB_URL):
+
+# Tables derived from SUMMARY_TABLE; stale once it is replaced on its own.
+ROLLUP_TABLES = (WEEKLY_TABLE, MONTHLY_TABLE, LIFETIME_TABLE)
+
+
+def load(df: pd.DataFrame, db_url: str = DB_URL, table: str = SUMMARY_TABLE):
     """Load data into target database."""
+    load_tables({table: df}, db_url)
+
+
+def load_tables(tables: dict[str, pd.DataFrame], db_url: str = DB_URL):
+    """Load several tables into the target database in a single transaction.
+
+    Replacing the daily summary without its rollups drops the old rollups,
+    so readers fall back to the daily table instead of serving stale totals.
+    """
     try:
         logger.info("Loading data into database")
         engine = create_engine(db_url)
-        df.to_sql("transaction_summary", con=engine, if_exists="replace", index=False)
-        logger.info(f"Loaded {len(df)} rows into {db_url}")
+        with engine.begin() as conn:
+            for table, df in tables.items():
+                df.to_sql(table, con=conn, if_exists="replace", index=False)
+                create_indexes(conn, table)
+                logger.info(f"Loaded {len(df)} rows into {table} at {db_url}")
+            if SUMMARY_TABLE in tables:
+                for table in ROLLUP_TABLES:
+                    if table not in tables:
+                        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
     except SQLAlchemyError as e:
         logger.error(f"Database error: {e}")
         raise
@@ -77,8 +301,8 @@ def run_pipeline():
     logger.info("Pipeline started")
     df = extract(DATA_FILE)
     df = validate(df)
-    df = transform(df)
-    load(df, DB_URL)
+    tables = transform_rollups(df, TRANSFORM_ENGINE)
+    load_tables(tables, DB_URL)
     logger.info("Pipeline completed successfully")
 
 if __name__ == "__main__":
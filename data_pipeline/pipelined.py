@@ -0,0 +1,230 @@
+"""
+Pipelined (streaming) execution of the ETL.
+
+`run_pipeline` in `pipeline.py` runs extract -> transform -> load strictly one
+after another on the whole file. `run_pipelined` streams the CSV in chunks
+through three threads joined by bounded queues, so parsing chunk N+1 overlaps
+with aggregating chunk N and writing chunk N-1:
+
+    extract (read_csv chunks) -> [queue] -> transform (per-chunk daily
+    partials) -> [queue] -> load (append partials to a staging table)
+
+Each queue holds at most `queue_size` chunks, so a slow stage blocks the one
+upstream of it and memory stays bounded by roughly
+(2 * queue_size + 3) * chunksize rows. pandas' CSV tokenizer and sqlite3
+release the GIL for most of their work, which is where the overlap comes from.
+
+Once every chunk is staged, the load stage reduces the partials and replaces
+the summary and rollup tables in SQL, in the same transaction. Readers
+therefore see either the old tables or the new ones. Results match
+`run_pipeline` up to floating-point summation order.
+
+The first error in any stage stops the other two and is re-raised from
+`run_pipelined`. The staging data and the transaction are then discarded.
+"""
+import os
+import logging
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from data_pipeline import pipeline
+from data_pipeline.query import (
+    LIFETIME_TABLE,
+    MONTHLY_TABLE,
+    SUMMARY_TABLE,
+    WEEKLY_TABLE,
+    create_indexes,
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500000"))
+QUEUE_SIZE = int(os.getenv("QUEUE_SIZE", "2"))
+
+_STAGING = "_staging_daily"
+_DONE = object()
+
+# Final tables are rebuilt from the staged partials; column types mirror
+# what `load_tables` produces through `DataFrame.to_sql`.
+_REBUILD_SQL = [
+    f"CREATE TEMP TABLE _daily AS "
+    f"SELECT user_id, date, SUM(total_amount) AS total_amount, SUM(txn_count) AS txn_count "
+    f"FROM {_STAGING} GROUP BY user_id, date",
+    f"DROP TABLE IF EXISTS {SUMMARY_TABLE}",
+    f"CREATE TABLE {SUMMARY_TABLE} (user_id TEXT, date DATE, total_amount FLOAT)",
+    f"INSERT INTO {SUMMARY_TABLE} SELECT user_id, date, total_amount FROM _daily ORDER BY user_id, date",
+    f"DROP TABLE IF EXISTS {WEEKLY_TABLE}",
+    f"CREATE TABLE {WEEKLY_TABLE} (user_id TEXT, week_start DATE, total_amount FLOAT, txn_count BIGINT)",
+    # strftime('%w') is 0 for Sunday; step back to the Monday of the week.
+    f"INSERT INTO {WEEKLY_TABLE} "
+    "SELECT user_id, date(date, printf('-%d days', (CAST(strftime('%w', date) AS INTEGER) + 6) % 7)) AS week_start, "
+    "SUM(total_amount), SUM(txn_count) FROM _daily GROUP BY user_id, week_start ORDER BY user_id, week_start",
+    f"DROP TABLE IF EXISTS {MONTHLY_TABLE}",
+    f"CREATE TABLE {MONTHLY_TABLE} (user_id TEXT, month DATE, total_amount FLOAT, txn_count BIGINT)",
+    f"INSERT INTO {MONTHLY_TABLE} "
+    "SELECT user_id, strftime('%Y-%m-01', date) AS month, SUM(total_amount), SUM(txn_count) "
+    "FROM _daily GROUP BY user_id, month ORDER BY user_id, month",
+    f"DROP TABLE IF EXISTS {LIFETIME_TABLE}",
+    f"CREATE TABLE {LIFETIME_TABLE} "
+    "(user_id TEXT, total_amount FLOAT, txn_count BIGINT, first_date DATE, last_date DATE)",
+    f"INSERT INTO {LIFETIME_TABLE} "
+    "SELECT user_id, SUM(total_amount), SUM(txn_count), MIN(date), MAX(date) "
+    "FROM _daily GROUP BY user_id ORDER BY user_id",
+    "DROP TABLE _daily",
+]
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class _Stages:
+    """Shared stop flag and first-error slot for the pipeline threads."""
+
+    def __init__(self):
+        self.stop = threading.Event()
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = exc
+        self.stop.set()
+
+    def put(self, q: queue.Queue, item) -> None:
+        """Blocking put that gives up once the pipeline is stopping (backpressure)."""
+        while True:
+            if self.stop.is_set():
+                raise _Cancelled
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q: queue.Queue):
+        while True:
+            if self.stop.is_set():
+                raise _Cancelled
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def run(self, name: str, target, *args) -> threading.Thread:
+        def wrapper():
+            try:
+                target(*args)
+            except _Cancelled:
+                logger.info(f"{name} stage cancelled")
+            except BaseException as e:
+                logger.error(f"{name} stage failed: {e}")
+                self.fail(e)
+
+        thread = threading.Thread(target=wrapper, name=f"pipeline-{name}", daemon=True)
+        thread.start()
+        return thread
+
+
+def _extract_stage(stages: _Stages, file_path: str, chunksize: int, out: queue.Queue) -> None:
+    logger.info(f"Extracting data from {file_path} in chunks of {chunksize}")
+    # Fixed user_id dtype: per-chunk inference would turn "101" into "101.0" in chunks with nulls.
+    with pd.read_csv(file_path, chunksize=chunksize, dtype=pipeline.READ_DTYPES) as reader:
+        for chunk in reader:
+            stages.put(out, chunk)
+    stages.put(out, _DONE)
+
+
+def _transform_chunk(chunk: pd.DataFrame, engine: str) -> pd.DataFrame:
+    """Daily (user_id, date) sums and counts for one chunk."""
+    daily, users = pipeline._aggregate_daily(pipeline._clean(pipeline.validate(chunk)), engine)
+    return pd.DataFrame({
+        "user_id": users.take(daily["user"]),
+        "date": np.datetime_as_string(daily["day"].to_numpy().astype("datetime64[D]")),
+        "total_amount": daily["total_amount"].to_numpy(dtype=np.float64),
+        "txn_count": daily["txn_count"].to_numpy(),
+    })
+
+
+def _transform_stage(stages: _Stages, engine: str, inp: queue.Queue, out: queue.Queue) -> None:
+    while (chunk := stages.get(inp)) is not _DONE:
+        stages.put(out, _transform_chunk(chunk, engine))
+    stages.put(out, _DONE)
+
+
+def _load_stage(stages: _Stages, db_url: str, inp: queue.Queue) -> None:
+    try:
+        engine = create_engine(db_url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS temp.{_STAGING}")
+            conn.exec_driver_sql(
+                f"CREATE TEMP TABLE {_STAGING} "
+                "(user_id TEXT, date TEXT, total_amount REAL, txn_count INTEGER)"
+            )
+            staged = 0
+            while (partial := stages.get(inp)) is not _DONE:
+                if partial.empty:  # every row in the chunk was invalid
+                    continue
+                conn.exec_driver_sql(
+                    f"INSERT INTO {_STAGING} VALUES (?, ?, ?, ?)",
+                    list(partial.itertuples(index=False, name=None)),
+                )
+                staged += len(partial)
+
+            logger.info(f"Staged {staged} partial rows; rebuilding summary tables")
+            for stmt in _REBUILD_SQL:
+                conn.execute(text(stmt))
+            for table in (SUMMARY_TABLE, WEEKLY_TABLE, MONTHLY_TABLE, LIFETIME_TABLE):
+                create_indexes(conn, table)
+                rows = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                logger.info(f"Loaded {rows} rows into {table} at {db_url}")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {e}")
+        raise
+
+
+def run_pipelined(
+    file_path: str | None = None,
+    db_url: str | None = None,
+    chunksize: int = CHUNK_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    engine: str | None = None,
+) -> None:
+    """Run extract/transform/load concurrently over chunks of the input file."""
+    file_path = file_path or pipeline.DATA_FILE
+    db_url = db_url or pipeline.DB_URL
+    engine = engine or pipeline.TRANSFORM_ENGINE
+    if chunksize < 1 or queue_size < 1:
+        raise ValueError("`chunksize` and `queue_size` must be positive integers.")
+
+    logger.info("Pipeline started (pipelined)")
+    stages = _Stages()
+    raw: queue.Queue = queue.Queue(maxsize=queue_size)
+    partials: queue.Queue = queue.Queue(maxsize=queue_size)
+    threads = [
+        stages.run("extract", _extract_stage, stages, file_path, chunksize, raw),
+        stages.run("transform", _transform_stage, stages, engine, raw, partials),
+        stages.run("load", _load_stage, stages, db_url, partials),
+    ]
+    try:
+        for thread in threads:
+            thread.join()
+    except BaseException as e:  # e.g. KeyboardInterrupt: cancel the workers too
+        stages.fail(e)
+        for thread in threads:
+            thread.join()
+        raise
+
+    if stages.error is not None:
+        raise stages.error
+    logger.info("Pipeline completed successfully")
+
+
+if __name__ == "__main__":
+    run_pipelined()
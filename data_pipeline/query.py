@@ -0,0 +1,236 @@
+"""Read-side query layer over the `transaction_summary` table.
+
+All lookups are served from the covering indexes created by `pipeline.load`,
+so they touch only the handful of index pages they return instead of
+scanning the table. Pagination is keyset-based (the last row seen is the
+cursor), which keeps every page O(log n) no matter how deep a client pages.
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+SUMMARY_TABLE = "transaction_summary"
+WEEKLY_TABLE = "transaction_summary_weekly"
+MONTHLY_TABLE = "transaction_summary_monthly"
+LIFETIME_TABLE = "user_lifetime_summary"
+
+# Covering indexes: each one contains every column its queries select, so
+# SQLite answers from the index b-tree without touching the table rows.
+SUMMARY_INDEXES = {
+    "ix_transaction_summary_user_date": "(user_id, date, total_amount)",
+    "ix_transaction_summary_date_user": "(date, user_id, total_amount)",
+}
+TABLE_INDEXES = {
+    SUMMARY_TABLE: SUMMARY_INDEXES,
+    WEEKLY_TABLE: {"ix_transaction_summary_weekly_user": "(user_id, week_start)"},
+    MONTHLY_TABLE: {"ix_transaction_summary_monthly_user": "(user_id, month)"},
+    LIFETIME_TABLE: {
+        "ix_user_lifetime_summary_user": "(user_id)",
+        "ix_user_lifetime_summary_total": "(total_amount DESC, user_id, txn_count)",
+    },
+}
+
+MAX_PAGE_SIZE = 1000
+
+# Statements are module-level constants so the driver's statement cache
+# reuses the prepared statement on every call.
+_USER_HISTORY_SQL = text(
+    f"SELECT date, total_amount FROM {SUMMARY_TABLE} "
+    "WHERE user_id = :user_id AND date >= :start AND date <= :end "
+    "ORDER BY date LIMIT :limit"
+)
+_USER_HISTORY_AFTER_SQL = text(
+    f"SELECT date, total_amount FROM {SUMMARY_TABLE} "
+    "WHERE user_id = :user_id AND date > :after AND date <= :end "
+    "ORDER BY date LIMIT :limit"
+)
+_DATE_RANGE_SQL = text(
+    f"SELECT date, user_id, total_amount FROM {SUMMARY_TABLE} "
+    "WHERE (date, user_id) > (:after_date, :after_user) AND date <= :end "
+    "ORDER BY date, user_id LIMIT :limit"
+)
+_TOP_USERS_LIFETIME_SQL = text(
+    f"SELECT user_id, total_amount AS total FROM {LIFETIME_TABLE} "
+    "ORDER BY total_amount DESC, user_id LIMIT :limit"
+)
+_HAS_TABLE_SQL = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+_TOP_USERS_SQL = text(
+    f"SELECT user_id, SUM(total_amount) AS total FROM {SUMMARY_TABLE} "
+    "WHERE date >= :start AND date <= :end "
+    "GROUP BY user_id ORDER BY total DESC, user_id LIMIT :limit"
+)
+
+# Sentinels bounding ISO dates, so open-ended ranges still use the index.
+_MIN_DATE = ""
+_MAX_DATE = "9999-12-31"
+
+
+def create_indexes(conn, table: str = SUMMARY_TABLE) -> None:
+    """Create the indexes used by the read layer on `table` (idempotent)."""
+    for name, columns in TABLE_INDEXES.get(table, {}).items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}"))
+
+
+def _sqlite_path(db_url: str) -> str:
+    url = make_url(db_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError(f"Read layer requires a file-backed SQLite URL, got {db_url}")
+    return os.path.abspath(url.database)
+
+
+def _page_size(limit: int) -> int:
+    if limit < 1:
+        raise ValueError("`limit` must be a positive integer.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+class SummaryReader:
+    """Pooled, read-only access to `transaction_summary` with cached aggregates."""
+
+    def __init__(self, db_url: str, pool_size: int = 4, cache_size: int = 128):
+        self.path = _sqlite_path(db_url)
+        self.engine = create_engine(
+            "sqlite://",
+            creator=self._connect,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+        )
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_version = None
+        self._cache_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _table_version(self) -> tuple:
+        """Cheap fingerprint of the database file; changes whenever the pipeline reloads.
+
+        SQLite bumps the file change counter (header bytes 24-27) on every
+        committed write, so this holds even where mtime is coarse and the file
+        size, which moves in whole pages, stays the same.
+        """
+        with open(self.path, "rb") as f:
+            header = f.read(28)
+        st = os.stat(self.path)
+        return int.from_bytes(header[24:28], "big"), st.st_mtime_ns, st.st_size
+
+    def _cached(self, key: tuple, compute):
+        version = self._table_version()
+        with self._cache_lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        value = compute()
+        with self._cache_lock:
+            if version == self._cache_version:
+                self._cache[key] = value
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop all cached aggregates."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_version = None
+
+    def user_history(
+        self,
+        user_id: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> dict:
+        """Daily totals for one user, ordered by date, one keyset page at a time."""
+        limit = _page_size(limit)
+        params = {"user_id": user_id, "end": end or _MAX_DATE, "limit": limit}
+        # `start` is inclusive, the cursor exclusive; bind whichever is tighter.
+        if after is not None and (start is None or after >= start):
+            stmt, params["after"] = _USER_HISTORY_AFTER_SQL, after
+        else:
+            stmt, params["start"] = _USER_HISTORY_SQL, start or _MIN_DATE
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt, params).all()
+
+        items = [{"date": r.date, "total_amount": r.total_amount} for r in rows]
+        next_cursor = {"after": rows[-1].date} if len(rows) == limit else None
+        return {"items": items, "next": next_cursor}
+
+    def date_range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        after_date: Optional[str] = None,
+        after_user: Optional[str] = None,
+        limit: int = 100,
+    ) -> dict:
+        """All (user, day) totals in a date range, ordered by (date, user_id)."""
+        limit = _page_size(limit)
+        if after_date is None or (start and after_date < start):
+            # Rows on `start` itself sort after ("start", "") since user_id is non-empty.
+            after_date, after_user = start or _MIN_DATE, ""
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                _DATE_RANGE_SQL,
+                {
+                    "after_date": after_date,
+                    "after_user": after_user or "",
+                    "end": end or _MAX_DATE,
+                    "limit": limit,
+                },
+            ).all()
+
+        items = [
+            {"date": r.date, "user_id": r.user_id, "total_amount": r.total_amount}
+            for r in rows
+        ]
+        next_cursor = (
+            {"after_date": rows[-1].date, "after_user": rows[-1].user_id}
+            if len(rows) == limit
+            else None
+        )
+        return {"items": items, "next": next_cursor}
+
+    def top_users(self, n: int = 10, start: Optional[str] = None, end: Optional[str] = None) -> list:
+        """Top-N users by summed total over an optional date range (cached).
+
+        Unbounded queries read the precomputed lifetime rollup when the
+        pipeline has loaded it, instead of re-aggregating daily history.
+        """
+        n = _page_size(n)
+        params = {"start": start or _MIN_DATE, "end": end or _MAX_DATE, "limit": n}
+
+        def compute():
+            with self.engine.connect() as conn:
+                if start is None and end is None and conn.execute(
+                    _HAS_TABLE_SQL, {"name": LIFETIME_TABLE}
+                ).first():
+                    rows = conn.execute(_TOP_USERS_LIFETIME_SQL, {"limit": n}).all()
+                else:
+                    rows = conn.execute(_TOP_USERS_SQL, params).all()
+            return [{"user_id": r.user_id, "total_amount": r.total} for r in rows]
+
+        return self._cached(("top_users", n, params["start"], params["end"]), compute)
+
+    def close(self) -> None:
+        self.engine.dispose()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import pytest
 from sqlalchemy import create_engine
@@ -62,15 +63,85 @@ def test_validate_drops_null_user_id(caplog):
         ),
     ],
 )
-def test_transform_aggregates(rows, expected_total):
+@pytest.mark.parametrize("engine", pipeline.AGG_ENGINES)
+def test_transform_aggregates(rows, expected_total, engine):
     """Ensure transform aggregates correctly by user/date."""
     df = pd.DataFrame(rows)
-    summary = pipeline.transform(df)
+    summary = pipeline.transform(df, engine=engine)
     assert not summary.empty
     assert summary["total_amount"].iloc[0] == expected_total
     assert pd.api.types.is_numeric_dtype(summary["total_amount"])
 
 
+def test_numpy_engine_matches_pandas_exactly():
+    """The numpy engine must reproduce the pandas engine bit for bit, including float rounding."""
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame({
+        "user_id": rng.choice([f"u{i}" for i in range(50)], n),
+        "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 40 * 86_400, n), unit="s"),
+        "amount": rng.standard_normal(n) * 1e6,
+    })
+
+    expected = pipeline.transform_rollups(df.copy(), engine="pandas")
+    actual = pipeline.transform_rollups(df.copy(), engine="numpy")
+    for table, frame in expected.items():
+        pd.testing.assert_frame_equal(actual[table], frame, check_exact=True)
+
+
+@pytest.mark.parametrize("engine", pipeline.AGG_ENGINES)
+def test_transform_groups_tz_aware_dates_by_local_day(engine):
+    """Offset timestamps fall on their local calendar day, not their UTC one."""
+    df = pd.DataFrame([
+        {"user_id": "u1", "date": "2025-09-01T23:30:00+05:00", "amount": 10},
+        {"user_id": "u1", "date": "2025-09-02T01:00:00+05:00", "amount": 5},
+    ])
+    summary = pipeline.transform(df, engine=engine)
+    assert [str(d) for d in summary["date"]] == ["2025-09-01", "2025-09-02"]
+    assert summary["total_amount"].tolist() == [10, 5]
+
+
+def test_transform_rejects_unknown_engine():
+    df = pd.DataFrame([{"user_id": "u1", "date": "2025-09-01", "amount": 1}])
+    with pytest.raises(ValueError, match="engine"):
+        pipeline.transform(df, engine="polars")
+
+
+def test_transform_rollups_granularities():
+    """Weekly/monthly/lifetime rollups should agree with the daily rows they come from."""
+    df = pd.DataFrame([
+        {"user_id": "u1", "date": "2025-09-01", "amount": 100},  # Monday
+        {"user_id": "u1", "date": "2025-09-01", "amount": 50},
+        {"user_id": "u1", "date": "2025-09-07", "amount": 10},   # Sunday, same week
+        {"user_id": "u1", "date": "2025-10-02", "amount": 5},
+        {"user_id": "u2", "date": "2025-08-31", "amount": 20},   # Sunday, previous week
+    ])
+    tables = pipeline.transform_rollups(df)
+
+    daily = tables["transaction_summary"]
+    pd.testing.assert_frame_equal(daily, pipeline.transform(df))
+
+    weekly = tables["transaction_summary_weekly"]
+    assert weekly.astype({"week_start": str}).to_dict("records") == [
+        {"user_id": "u1", "week_start": "2025-09-01", "total_amount": 160, "txn_count": 3},
+        {"user_id": "u1", "week_start": "2025-09-29", "total_amount": 5, "txn_count": 1},
+        {"user_id": "u2", "week_start": "2025-08-25", "total_amount": 20, "txn_count": 1},
+    ]
+
+    monthly = tables["transaction_summary_monthly"]
+    assert monthly.astype({"month": str})[["user_id", "month", "txn_count"]].values.tolist() == [
+        ["u1", "2025-09-01", 3],
+        ["u1", "2025-10-01", 1],
+        ["u2", "2025-08-01", 1],
+    ]
+
+    lifetime = tables["user_lifetime_summary"].set_index("user_id")
+    assert lifetime.loc["u1", "total_amount"] == 165
+    assert lifetime.loc["u1", "txn_count"] == 4
+    assert str(lifetime.loc["u1", "first_date"]) == "2025-09-01"
+    assert str(lifetime.loc["u1", "last_date"]) == "2025-10-02"
+
+
 def test_load_writes_to_database(tmp_path):
     db_path = tmp_path / "transactions.db"
     db_url = f"sqlite:///{db_path}"
@@ -101,3 +172,6 @@ def test_run_pipeline_end_to_end(tmp_path):
     rows = pd.read_sql("SELECT * FROM transaction_summary", engine)
     assert not rows.empty
     assert set(rows.columns) == {"user_id", "date", "total_amount"}
+
+    for table in ["transaction_summary_weekly", "transaction_summary_monthly", "user_lifetime_summary"]:
+        assert not pd.read_sql(f"SELECT * FROM {table}", engine).empty
@@ -0,0 +1,107 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from data_pipeline import pipeline, pipelined
+
+TABLES = [
+    "transaction_summary",
+    "transaction_summary_weekly",
+    "transaction_summary_monthly",
+    "user_lifetime_summary",
+]
+
+
+def _write_csv(path, n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_id": rng.choice([f"u{i}" for i in range(40)], n),
+        "date": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 90, n), unit="D")).strftime("%Y-%m-%d"),
+        "amount": np.round(rng.random(n) * 100, 2),
+    })
+    df.loc[::97, "user_id"] = None
+    df.to_csv(path, index=False)
+
+
+def _read(db_url, table):
+    return pd.read_sql(f"SELECT * FROM {table}", create_engine(db_url))
+
+
+def test_pipelined_matches_batch(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    _write_csv(csv_path)
+    batch_url = f"sqlite:///{tmp_path / 'batch.db'}"
+    streamed_url = f"sqlite:///{tmp_path / 'streamed.db'}"
+
+    pipeline.load_tables(pipeline.transform_rollups(pipeline.validate(pipeline.extract(csv_path))), batch_url)
+    pipelined.run_pipelined(str(csv_path), streamed_url, chunksize=700, queue_size=1)
+
+    for table in TABLES:
+        expected, actual = _read(batch_url, table), _read(streamed_url, table)
+        assert list(actual.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+
+def test_numeric_user_ids_match_batch_across_chunks(tmp_path):
+    # Chunk 2 holds only a numeric ID and a null, which would infer as float.
+    csv_path = tmp_path / "numeric.csv"
+    csv_path.write_text(
+        "user_id,date,amount\n"
+        "abc,2025-01-01,1.0\n"
+        "101,2025-01-01,2.0\n"
+        ",2025-01-02,3.0\n"
+        "101,2025-01-02,4.0\n"
+    )
+    batch_url = f"sqlite:///{tmp_path / 'batch.db'}"
+    streamed_url = f"sqlite:///{tmp_path / 'streamed.db'}"
+
+    pipeline.load_tables(pipeline.transform_rollups(pipeline.validate(pipeline.extract(csv_path))), batch_url)
+    pipelined.run_pipelined(str(csv_path), streamed_url, chunksize=2, queue_size=1)
+
+    lifetime = _read(streamed_url, "user_lifetime_summary")
+    assert sorted(lifetime["user_id"]) == ["101", "abc"]
+    for table in TABLES:
+        pd.testing.assert_frame_equal(_read(streamed_url, table), _read(batch_url, table))
+
+
+def test_chunk_without_valid_rows_is_skipped(tmp_path):
+    # The second chunk has no user IDs, so validation leaves nothing to stage.
+    csv_path = tmp_path / "sparse.csv"
+    csv_path.write_text(
+        "user_id,date,amount\n"
+        "u1,2025-01-01,1.0\n"
+        "u2,2025-01-01,2.0\n"
+        ",2025-01-02,3.0\n"
+        ",2025-01-02,4.0\n"
+        "u1,2025-01-03,5.0\n"
+    )
+    batch_url = f"sqlite:///{tmp_path / 'batch.db'}"
+    streamed_url = f"sqlite:///{tmp_path / 'streamed.db'}"
+
+    pipeline.load_tables(pipeline.transform_rollups(pipeline.validate(pipeline.extract(csv_path))), batch_url)
+    pipelined.run_pipelined(str(csv_path), streamed_url, chunksize=2, queue_size=1)
+
+    for table in TABLES:
+        pd.testing.assert_frame_equal(_read(streamed_url, table), _read(batch_url, table))
+
+
+def test_pipelined_error_cancels_and_keeps_existing_tables(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'transactions.db'}"
+    pipeline.load(pd.DataFrame([{"user_id": "u1", "date": "2025-09-01", "total_amount": 1.0}]), db_url)
+
+    csv_path = tmp_path / "bad.csv"
+    csv_path.write_text("user_id,date\nu1,2025-09-01\n" * 50)
+
+    with pytest.raises(ValueError, match="required columns"):
+        pipelined.run_pipelined(str(csv_path), db_url, chunksize=10, queue_size=1)
+
+    assert _read(db_url, "transaction_summary")["total_amount"].tolist() == [1.0]
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def test_pipelined_rejects_bad_sizes(tmp_path):
+    with pytest.raises(ValueError):
+        pipelined.run_pipelined(str(tmp_path / "x.csv"), f"sqlite:///{tmp_path / 'x.db'}", chunksize=0)
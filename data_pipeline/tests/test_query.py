@@ -0,0 +1,159 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from data_pipeline import pipeline
+from data_pipeline.api import app, get_reader
+from data_pipeline.query import SUMMARY_INDEXES, SummaryReader
+
+
+ROWS = [
+    {"user_id": "u1", "date": "2025-09-01", "total_amount": 250.0},
+    {"user_id": "u1", "date": "2025-09-02", "total_amount": 10.0},
+    {"user_id": "u1", "date": "2025-09-03", "total_amount": 5.0},
+    {"user_id": "u2", "date": "2025-09-01", "total_amount": 180.5},
+    {"user_id": "u2", "date": "2025-09-02", "total_amount": 20.0},
+    {"user_id": "u3", "date": "2025-09-02", "total_amount": 400.0},
+]
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'transactions.db'}"
+    pipeline.load(pd.DataFrame(ROWS), url)
+    return url
+
+
+@pytest.fixture
+def reader(db_url):
+    r = SummaryReader(db_url, pool_size=2)
+    yield r
+    r.close()
+
+
+def test_load_creates_covering_indexes(db_url):
+    conn = sqlite3.connect(db_url.removeprefix("sqlite:///"))
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(SUMMARY_INDEXES).issubset(names)
+
+    plan = " ".join(
+        str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT date, total_amount FROM transaction_summary "
+            "WHERE user_id = 'u1' AND date > '2025-09-01' ORDER BY date LIMIT 10"
+        )
+    )
+    assert "COVERING INDEX" in plan
+
+
+def test_user_history_keyset_pages(reader):
+    first = reader.user_history("u1", limit=2)
+    assert [i["date"] for i in first["items"]] == ["2025-09-01", "2025-09-02"]
+    assert first["next"] == {"after": "2025-09-02"}
+
+    second = reader.user_history("u1", after=first["next"]["after"], limit=2)
+    assert [i["date"] for i in second["items"]] == ["2025-09-03"]
+    assert second["next"] is None
+
+
+def test_user_history_date_bounds(reader):
+    page = reader.user_history("u1", start="2025-09-02", end="2025-09-02")
+    assert page["items"] == [{"date": "2025-09-02", "total_amount": 10.0}]
+
+
+def test_date_range_walks_every_row_once(reader):
+    seen, cursor = [], {}
+    while True:
+        page = reader.date_range(start="2025-09-01", end="2025-09-02", limit=2, **cursor)
+        seen += [(i["date"], i["user_id"]) for i in page["items"]]
+        if page["next"] is None:
+            break
+        cursor = page["next"]
+
+    expected = sorted((r["date"], r["user_id"]) for r in ROWS if r["date"] <= "2025-09-02")
+    assert seen == expected
+
+
+def test_top_users_cached_until_reload(reader, db_url):
+    assert [u["user_id"] for u in reader.top_users(2)] == ["u3", "u1"]
+    assert reader.top_users(1, start="2025-09-02") == [{"user_id": "u3", "total_amount": 400.0}]
+
+    pipeline.load(pd.DataFrame([{"user_id": "u9", "date": "2025-09-05", "total_amount": 1.0}]), db_url)
+    assert reader.top_users(2) == [{"user_id": "u9", "total_amount": 1.0}]
+
+
+def test_top_users_cache_invalidated_when_size_and_mtime_match(reader, db_url):
+    # Same-size reload with mtime reset: only the SQLite change counter differs.
+    path = db_url.removeprefix("sqlite:///")
+    assert reader.top_users(1) == [{"user_id": "u3", "total_amount": 400.0}]
+    before = os.stat(path)
+
+    swapped = [{**row, "user_id": {"u1": "u3", "u3": "u1"}.get(row["user_id"], row["user_id"])} for row in ROWS]
+    pipeline.load(pd.DataFrame(swapped), db_url)
+    os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+    assert os.stat(path).st_size == before.st_size
+
+    assert reader.top_users(1) == [{"user_id": "u1", "total_amount": 400.0}]
+
+
+def test_top_users_reads_lifetime_rollup(tmp_path):
+    url = f"sqlite:///{tmp_path / 'rollups.db'}"
+    raw = pd.DataFrame(ROWS).rename(columns={"total_amount": "amount"})
+    pipeline.load_tables(pipeline.transform_rollups(raw), url)
+
+    r = SummaryReader(url)
+    try:
+        assert [u["user_id"] for u in r.top_users(3)] == ["u3", "u1", "u2"]
+        # Date-bounded queries still aggregate the daily table.
+        assert r.top_users(1, end="2025-09-01") == [{"user_id": "u1", "total_amount": 250.0}]
+    finally:
+        r.close()
+
+
+def test_load_drops_stale_rollups(tmp_path):
+    url = f"sqlite:///{tmp_path / 'rollups.db'}"
+    raw = pd.DataFrame(ROWS).rename(columns={"total_amount": "amount"})
+    pipeline.load_tables(pipeline.transform_rollups(raw), url)
+    # Replacing only the daily table must not leave old rollups behind.
+    pipeline.load(pd.DataFrame([{"user_id": "u9", "date": "2025-09-05", "total_amount": 1.0}]), url)
+
+    with sqlite3.connect(tmp_path / "rollups.db") as conn:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"transaction_summary"}
+
+    r = SummaryReader(url)
+    try:
+        assert r.top_users(3) == [{"user_id": "u9", "total_amount": 1.0}]
+    finally:
+        r.close()
+
+
+def test_reader_is_read_only(reader):
+    with pytest.raises(Exception):
+        with reader.engine.connect() as conn:
+            conn.exec_driver_sql("DELETE FROM transaction_summary")
+
+
+def test_api_endpoints(reader):
+    app.dependency_overrides[get_reader] = lambda: reader
+    try:
+        client = TestClient(app)
+
+        r = client.get("/users/u2/summary", params={"limit": 1})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["items"] == [{"date": "2025-09-01", "total_amount": 180.5}]
+        assert body["next"] == {"after": "2025-09-01"}
+
+        r = client.get("/summary", params={"start": "2025-09-02", "end": "2025-09-02", "limit": 10})
+        assert [i["user_id"] for i in r.json()["items"]] == ["u1", "u2", "u3"]
+
+        r = client.get("/summary", params={"after_date": "2025-09-02"})
+        assert r.status_code == 400
+
+        r = client.get("/users/top", params={"n": 1})
+        assert r.json() == [{"user_id": "u3", "total_amount": 400.0}]
+    finally:
+        app.dependency_overrides.clear()
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Literal, Optional
 from typing_extensions import Annotated
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel, Field, constr
 
-from .model.predict import predict_sentiment
+from serving.admission import admission_guard, admission_metrics
+from serving.profiling import install_profiling
+
+from serving.registry import ModelNotFoundError
+
+from .model.predict import predict_sentiment, registry
 
 app = FastAPI(
     title="Sentiment Analysis API",
@@ -22,6 +27,9 @@ class PredictionRequest(BaseModel):
         str,
         Field(..., description="Plain text to analyze", min_length=1, max_length=10000)
     ]
+    model_name: Optional[str] = Field(
+        None, description="Registry model as `name` or `name@version` (default: sentiment_model)"
+    )
 
 
 class PredictionResponse(BaseModel):
@@ -34,17 +42,28 @@ def health() -> dict:
     return {"status": "ok"}
 
 
-@app.post("/predict", response_model=PredictionResponse)
+@app.get("/metrics")
+def metrics() -> dict:
+    return {"admission": admission_metrics(), "models": registry.stats()}
+
+
+@app.post("/predict", response_model=PredictionResponse, dependencies=[Depends(admission_guard("predict"))])
 def predict(req: PredictionRequest):
     txt = req.text
     if len(txt) > MAX_TEXT_LEN:
         raise HTTPException(status_code=413, detail=f"Text too long (>{MAX_TEXT_LEN} chars).")
 
     try:
-        out = predict_sentiment(txt)
+        out = predict_sentiment(txt, req.model_name)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     return out
+
+
+# Opt-in per-request profiling (PROFILING_ENABLED); must come after all routes
+install_profiling(app)
@@ -0,0 +1,337 @@
+"""
+Offline bulk sentiment scoring for large files.
+
+Streams a CSV or NDJSON file in chunks, scores each chunk with one vectorized
+`predict_proba` call in a pool of worker processes, and writes the results in
+input order to CSV, Parquet or a SQLite table:
+
+    python -m ml_integration.model.batch reviews.csv scores.csv --workers 4
+    python -m ml_integration.model.batch reviews.ndjson scores.db --table review_scores
+    python -m ml_integration.model.batch reviews.csv scores.parquet --resume
+
+Output columns: `row` (0-based input row), the `--id-column` if given,
+`label` and `score`. Blank texts get an empty label and a null score.
+
+The output format follows the output suffix:
+
+- `.csv`: a single file; progress is checkpointed to `<output>.progress`,
+- `.parquet`: a directory of `part-NNNNNN.parquet` files, one per chunk
+  (readable as one dataset with `pd.read_parquet`); needs pyarrow,
+- `.db` / `.sqlite` / `.sqlite3`: a table, committed once per chunk.
+
+With `--resume`, a run continues after the last chunk that was fully written.
+Without it, existing output is replaced.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from serving.registry import ModelNotFoundError
+
+from .predict import DEFAULT_MODEL, LABEL_MAP, MODEL_PATH, registry
+
+CHUNK_SIZE = 20_000
+DEFAULT_TABLE = "sentiment_scores"
+NDJSON_SUFFIXES = {".ndjson", ".jsonl", ".json"}
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+# Model loaded once per worker process
+_model = None
+
+
+def _init_worker(model_path: str) -> None:
+    global _model
+    _model = joblib.load(model_path)
+
+
+def _score(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Class index and probability of the predicted class for each text."""
+    if not texts:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    probs = _model.predict_proba(texts)
+    idx = probs.argmax(axis=1)
+    return idx, probs[np.arange(len(idx)), idx]
+
+
+class _InlineExecutor:
+    """Runs `_score` in this process (workers=1); avoids pickling chunks."""
+
+    def __init__(self, model_path: str):
+        _init_worker(model_path)
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, cancel_futures: bool = False) -> None:
+        pass
+
+
+def _model_path(model_name: Optional[str]) -> Path:
+    try:
+        return registry.resolve(model_name or DEFAULT_MODEL).path
+    except ModelNotFoundError:
+        if model_name is None:
+            raise FileNotFoundError(
+                f"Model not found at {MODEL_PATH}. Run `python -m ml_integration.model.train` first."
+            )
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Input
+# ---------------------------------------------------------------------------
+def _read_chunks(path: Path, chunk_size: int, columns: list[str]) -> Iterator[pd.DataFrame]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns, dtype=str, keep_default_na=False)
+    elif suffix in NDJSON_SUFFIXES:
+        for chunk in pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False):
+            missing = set(columns) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"{path} has no column(s) {sorted(missing)}")
+            yield chunk[columns]
+    else:
+        raise ValueError(f"Unsupported input format {suffix!r}; use .csv or .ndjson/.jsonl")
+
+
+def _skip_rows(chunks: Iterator[pd.DataFrame], n: int) -> Iterator[pd.DataFrame]:
+    """Drop the first `n` rows (already written by an earlier run)."""
+    for chunk in chunks:
+        if n >= len(chunk):
+            n -= len(chunk)
+            continue
+        yield chunk.iloc[n:]
+        n = 0
+
+
+# ---------------------------------------------------------------------------
+# Output (each writer knows how many rows a previous run completed)
+# ---------------------------------------------------------------------------
+class _CsvWriter:
+    def __init__(self, path: Path, resume: bool):
+        self.path = path
+        self.checkpoint = path.with_name(path.name + ".progress")
+        state = {"rows": 0, "bytes": 0}
+        if resume and self.checkpoint.exists() and path.exists():
+            state = json.loads(self.checkpoint.read_text())
+        self.rows_done = state["rows"]
+        self._file = open(path, "r+b" if state["bytes"] else "wb")
+        # Drop anything written after the last checkpoint
+        self._file.truncate(state["bytes"])
+        self._file.seek(state["bytes"])
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._file.write(df.to_csv(index=False, header=self._file.tell() == 0).encode())
+        self._file.flush()
+        self.rows_done += len(df)
+        tmp = self.checkpoint.with_name(self.checkpoint.name + ".tmp")
+        tmp.write_text(json.dumps({"rows": self.rows_done, "bytes": self._file.tell()}))
+        os.replace(tmp, self.checkpoint)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, resume: bool):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        self._pq = pq
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        parts = sorted(path.glob("part-*.parquet"))
+        if not resume:
+            for part in parts:
+                part.unlink()
+            parts = []
+        self._next_part = len(parts)
+        self.rows_done = sum(pq.read_metadata(part).num_rows for part in parts)
+
+    def write(self, df: pd.DataFrame) -> None:
+        part = self.path / f"part-{self._next_part:06d}.parquet"
+        tmp = part.with_name(f".{part.name}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, part)  # parts are complete or absent
+        self._next_part += 1
+        self.rows_done += len(df)
+
+    def close(self) -> None:
+        pass
+
+
+class _SqliteWriter:
+    def __init__(self, path: Path, resume: bool, table: str, id_column: Optional[str]):
+        for name in filter(None, (table, id_column)):
+            if not name.isidentifier():
+                raise ValueError(f"Invalid SQLite identifier {name!r}")
+        self._conn = sqlite3.connect(path)
+        if not resume:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        id_def = f'"{id_column}", ' if id_column else ""
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ("row" INTEGER PRIMARY KEY, {id_def}"label" TEXT, "score" REAL)'
+        )
+        self._conn.commit()
+        n_columns = 4 if id_column else 3
+        self._insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * n_columns)})'
+        # Chunks are committed whole, so the row count is the resume point
+        self.rows_done = self._conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+    def write(self, df: pd.DataFrame) -> None:
+        with self._conn:
+            self._conn.executemany(self._insert, zip(*(df[c].tolist() for c in df.columns)))
+        self.rows_done += len(df)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _open_writer(path: Path, resume: bool, table: str, id_column: Optional[str]):
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return _CsvWriter(path, resume)
+    if suffix == ".parquet":
+        return _ParquetWriter(path, resume)
+    if suffix in SQLITE_SUFFIXES:
+        return _SqliteWriter(path, resume, table, id_column)
+    raise ValueError(f"Unsupported output format {suffix!r}; use .csv, .parquet or .db/.sqlite")
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+def score_file(
+    input_path: Path | str,
+    output_path: Path | str,
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = 1,
+    model_name: Optional[str] = None,
+    table: str = DEFAULT_TABLE,
+    resume: bool = False,
+    verbose: bool = False,
+) -> dict:
+    """
+    Score every text in `input_path` and write labels/scores to `output_path`.
+
+    Chunks are scored concurrently by `workers` processes but written strictly
+    in input order. Returns throughput stats for the run.
+    """
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("chunk_size and workers must be positive")
+    input_path, output_path = Path(input_path), Path(output_path)
+    model_path = str(_model_path(model_name))
+    columns = [text_column] + ([id_column] if id_column else [])
+
+    writer = _open_writer(output_path, resume, table, id_column)
+    skipped = writer.rows_done
+    if workers == 1:
+        executor = _InlineExecutor(model_path)
+    else:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,))
+
+    start = time.perf_counter()
+    next_row = skipped
+    scored = 0
+    pending: deque = deque()
+
+    def write_oldest() -> None:
+        nonlocal scored
+        chunk, mask, future = pending.popleft()
+        idx, probs = future.result()
+        labels = np.full(len(chunk), None, dtype=object)
+        labels[mask] = pd.Series(idx).map(LABEL_MAP).fillna(pd.Series(idx).astype(str)).to_numpy()
+        scores = np.full(len(chunk), np.nan)
+        scores[mask] = probs
+        out = {"row": np.arange(chunk.index[0], chunk.index[0] + len(chunk))}
+        if id_column:
+            out[id_column] = chunk[id_column].to_numpy()
+        out.update(label=labels, score=scores)
+        writer.write(pd.DataFrame(out))
+        scored += len(chunk)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"{writer.rows_done:,} rows written ({scored / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    try:
+        for chunk in _skip_rows(_read_chunks(input_path, chunk_size, columns), skipped):
+            chunk.index = pd.RangeIndex(next_row, next_row + len(chunk))
+            next_row += len(chunk)
+            texts = chunk[text_column].fillna("").astype(str)
+            mask = (texts.str.strip() != "").to_numpy()
+            pending.append((chunk, mask, executor.submit(_score, texts[mask].tolist())))
+            # Bounded look-ahead keeps every worker busy without reading the whole file
+            if len(pending) >= 2 * workers:
+                write_oldest()
+        while pending:
+            write_oldest()
+    finally:
+        executor.shutdown(cancel_futures=True)
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    rows_per_sec = scored / seconds if seconds else 0.0
+    return {
+        "rows_scored": scored,
+        "rows_skipped": skipped,
+        "seconds": round(seconds, 3),
+        "workers": workers,
+        "rows_per_sec": round(rows_per_sec),
+        "rows_per_sec_per_worker": round(rows_per_sec / workers),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="CSV or NDJSON file with a text column")
+    parser.add_argument("output", type=Path, help=".csv, .parquet or .db/.sqlite output")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", help="input column copied to the output next to each score")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scoring processes (default: all cores)")
+    parser.add_argument("--model-name", help="registry model (name or name@version); default: sentiment_model")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help="SQLite table (default: %(default)s)")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run instead of starting over")
+    parser.add_argument("--quiet", action="store_true", help="no per-chunk progress")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = score_file(
+            args.input,
+            args.output,
+            text_column=args.text_column,
+            id_column=args.id_column,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            model_name=args.model_name,
+            table=args.table,
+            resume=args.resume,
+            verbose=not args.quiet,
+        )
+    except (FileNotFoundError, ModelNotFoundError, RuntimeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
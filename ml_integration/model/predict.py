@@ -1,40 +1,50 @@
 from __future__ import annotations
 
 from pathlib import Path
-import threading
-from typing import Dict
+from typing import Dict, Optional
 import sys
 
-import joblib
 import numpy as np
 
+from serving.registry import ModelNotFoundError, ModelRef, ModelRegistry
+
 # Path to the trained model
 MODEL_PATH = Path(__file__).with_name("sentiment_model.joblib")
+DEFAULT_MODEL = MODEL_PATH.stem
 LABEL_MAP = {0: "negative", 1: "positive"}
 
-_model = None
-_lock = threading.Lock()
+# Artifacts live next to this file: `sentiment_model.joblib` (the default) or
+# versioned `<name>/<version>.joblib` directories; see serving/registry.py.
+registry = ModelRegistry(MODEL_PATH.parent, suffixes=(".joblib",))
+
+# The default model is resolved once and pinned, so cache hits skip the
+# filesystem lookup; a newly trained version is picked up on restart.
+_default_ref: Optional[ModelRef] = None
 
 
-def _load_model():
-    """Lazy-load the model once, thread-safe."""
-    global _model
-    with _lock:
-        if _model is None:
-            if not MODEL_PATH.exists():
-                raise FileNotFoundError(
-                    f"Model not found at {MODEL_PATH}. Run `python -m ml_integration.model.train` first."
-                )
-            _model = joblib.load(MODEL_PATH)
-    return _model
+def _load_model(model_name: Optional[str] = None):
+    """Lazy-load a model through the registry (once per version, thread-safe)."""
+    global _default_ref
+    if model_name is not None:
+        return registry.get(model_name)
+    if _default_ref is None:
+        try:
+            _default_ref = registry.resolve(DEFAULT_MODEL)
+        except ModelNotFoundError:
+            raise FileNotFoundError(
+                f"Model not found at {MODEL_PATH}. Run `python -m ml_integration.model.train` first."
+            )
+    return registry.get(_default_ref)
 
 
-def predict_sentiment(text: str) -> Dict[str, float | str]:
+def predict_sentiment(text: str, model_name: Optional[str] = None) -> Dict[str, float | str]:
     """
     Predict the sentiment of a given text string.
 
     Args:
         text (str): Input sentence to analyze.
+        model_name (str, optional): Registry model (`name` or `name@version`);
+            defaults to the trained `sentiment_model`.
 
     Returns:
         dict: {
@@ -45,7 +55,7 @@ def predict_sentiment(text: str) -> Dict[str, float | str]:
     if not isinstance(text, str) or not text.strip():
         raise ValueError("`text` must be a non-empty string.")
 
-    model = _load_model()
+    model = _load_model(model_name)
     probs = model.predict_proba([text])[0]
     idx = int(np.argmax(probs))
     return {
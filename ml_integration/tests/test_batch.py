@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from ml_integration.model import batch
+from ml_integration.model.predict import predict_sentiment
+
+TEXTS = [
+    "I absolutely love this!",
+    "This is terrible and I hate it.",
+    "",
+    "Great value and works perfectly.",
+    "Awful packaging and broken on arrival.",
+] * 5
+
+
+@pytest.fixture
+def reviews_csv(tmp_path):
+    path = tmp_path / "reviews.csv"
+    pd.DataFrame({"review_id": [f"r{i}" for i in range(len(TEXTS))], "text": TEXTS}).to_csv(path, index=False)
+    return path
+
+
+def _expected():
+    rows = []
+    for text in TEXTS:
+        res = predict_sentiment(text) if text else {"label": None, "score": None}
+        rows.append((res["label"], res["score"]))
+    return rows
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_csv_to_csv_preserves_order(tmp_path, reviews_csv, workers):
+    out = tmp_path / "scores.csv"
+    stats = batch.score_file(reviews_csv, out, id_column="review_id", chunk_size=4, workers=workers)
+    assert stats["rows_scored"] == len(TEXTS) and stats["rows_per_sec"] > 0
+
+    df = pd.read_csv(out)
+    assert df["row"].tolist() == list(range(len(TEXTS)))
+    assert df["review_id"].tolist() == [f"r{i}" for i in range(len(TEXTS))]
+    got = [(None if pd.isna(l) else l, None if pd.isna(s) else s) for l, s in zip(df["label"], df["score"])]
+    assert got == pytest.approx(_expected())
+
+
+def test_ndjson_to_sqlite(tmp_path):
+    src = tmp_path / "reviews.ndjson"
+    src.write_text("\n".join(json.dumps({"text": t}) for t in TEXTS) + "\n")
+    out = tmp_path / "scores.db"
+    batch.score_file(src, out, chunk_size=7, table="review_scores")
+
+    with sqlite3.connect(out) as conn:
+        rows = conn.execute('SELECT "row", label, score FROM review_scores ORDER BY "row"').fetchall()
+    assert [r[0] for r in rows] == list(range(len(TEXTS)))
+    assert [(r[1], r[2]) for r in rows] == pytest.approx(_expected())
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".db"])
+def test_resume_after_interruption(tmp_path, reviews_csv, monkeypatch, suffix):
+    full = tmp_path / f"full{suffix}"
+    batch.score_file(reviews_csv, full, chunk_size=4)
+
+    out = tmp_path / f"scores{suffix}"
+    writer_cls = batch._CsvWriter if suffix == ".csv" else batch._SqliteWriter
+    original_write = writer_cls.write
+    calls = []
+
+    def flaky_write(self, df):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        original_write(self, df)
+
+    monkeypatch.setattr(writer_cls, "write", flaky_write)
+    with pytest.raises(KeyboardInterrupt):
+        batch.score_file(reviews_csv, out, chunk_size=4)
+    monkeypatch.setattr(writer_cls, "write", original_write)
+
+    stats = batch.score_file(reviews_csv, out, chunk_size=4, resume=True)
+    assert stats["rows_skipped"] == 8
+    assert stats["rows_scored"] == len(TEXTS) - 8
+    if suffix == ".csv":
+        assert out.read_bytes() == full.read_bytes()
+    else:
+        query = 'SELECT * FROM sentiment_scores ORDER BY "row"'
+        with sqlite3.connect(out) as a, sqlite3.connect(full) as b:
+            assert a.execute(query).fetchall() == b.execute(query).fetchall()
+
+
+def test_parquet_output(tmp_path, reviews_csv):
+    pytest.importorskip("pyarrow")
+    out = tmp_path / "scores.parquet"
+    batch.score_file(reviews_csv, out, chunk_size=10)
+    df = pd.read_parquet(out)
+    assert df["row"].tolist() == list(range(len(TEXTS)))
+
+
+def test_cli_rejects_unknown_format(tmp_path, reviews_csv, capsys):
+    assert batch.main([str(reviews_csv), str(tmp_path / "scores.xlsx"), "--quiet"]) == 1
+    assert "Unsupported output format" in capsys.readouterr().err
@@ -6,6 +6,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from ml_integration.api import app
+from ml_integration.model import predict
 from ml_integration.model.predict import predict_sentiment
 from ml_integration.model.train import MODEL_PATH
 
@@ -52,3 +53,20 @@ def test_health_check():
     resp = client.get("/healthz")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+def test_predict_api_unknown_model():
+    """Unknown registry models are reported as 404, not a server error."""
+    resp = client.post("/predict", json={"text": "This is great", "model_name": "metrics"})
+    assert resp.status_code == 404
+
+
+def test_default_model_is_resolved_once(monkeypatch):
+    """Repeat predictions with the default model don't hit the filesystem again."""
+    predict_sentiment("warm up")
+    calls = []
+    resolve = predict.registry.resolve
+    monkeypatch.setattr(predict.registry, "resolve", lambda *a, **kw: calls.append(a) or resolve(*a, **kw))
+    for _ in range(3):
+        predict_sentiment("This is great")
+    assert calls == []
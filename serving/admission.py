@@ -0,0 +1,213 @@
+"""
+Admission control and load shedding for inference routes.
+
+Each guarded route gets an `AdmissionController` with:
+
+- a concurrency limit (requests running the handler at once),
+- a bounded FIFO wait queue for requests over the limit,
+- a queue deadline: requests that cannot start within it are shed,
+- an optional per-key token-bucket rate limit (keyed on the bearer token).
+
+Shed requests fail fast with `503 Service Unavailable` (or `429 Too Many
+Requests` when rate limited) and a `Retry-After` header, instead of piling up
+behind a saturated worker pool.
+
+Limits come from the environment, with per-route overrides:
+
+    ADMISSION_MAX_CONCURRENCY=16             # all routes
+    ADMISSION_YELLOW_FLAG_MAX_CONCURRENCY=4  # route "yellow_flag" only
+    ADMISSION_MAX_QUEUE=64
+    ADMISSION_QUEUE_TIMEOUT_MS=1000
+    ADMISSION_RATE_LIMIT=0                   # requests/second per token; 0 disables
+    ADMISSION_BURST=0                        # bucket size; defaults to max(1, rate)
+
+All bookkeeping happens on the event loop (the guard is an async dependency),
+so no locks are needed.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException
+
+from .profiling import phase
+
+_controllers: dict[str, "AdmissionController"] = {}
+
+
+def _env(name: str, key: str, default: float) -> float:
+    route_var = f"ADMISSION_{name.upper().replace('.', '_').replace('/', '_')}_{key}"
+    return float(os.getenv(route_var, os.getenv(f"ADMISSION_{key}", default)))
+
+
+class AdmissionController:
+    """Concurrency limit + bounded queue + deadline (+ rate limit) for one route."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 1.0,
+        rate_limit: float = 0.0,
+        burst: float = 0.0,
+    ):
+        if max_concurrency < 1 or max_queue < 0 or queue_timeout < 0 or rate_limit < 0:
+            raise ValueError(f"Invalid admission limits for route {name!r}")
+        if burst and burst < 1:  # 0 means the default; a smaller bucket never admits anything
+            raise ValueError(f"Invalid admission limits for route {name!r}")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1.0, rate_limit)  # a bucket must hold at least one request
+
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "timeout": 0, "rate_limited": 0}
+        self.queued = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "AdmissionController":
+        return cls(
+            name,
+            max_concurrency=int(_env(name, "MAX_CONCURRENCY", 16)),
+            max_queue=int(_env(name, "MAX_QUEUE", 64)),
+            queue_timeout=_env(name, "QUEUE_TIMEOUT_MS", 1000) / 1000,
+            rate_limit=_env(name, "RATE_LIMIT", 0),
+            burst=_env(name, "BURST", 0),
+        )
+
+    def _reject(self, reason: str, status_code: int = 503, retry_after: float = 1.0):
+        self.shed[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"Server busy ({reason.replace('_', ' ')}); retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def check_rate(self, key: str) -> None:
+        """Token bucket per key; raises 429 when `key` is over its rate."""
+        if not self.rate_limit:
+            return
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate_limit)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._reject("rate_limited", 429, (1 - tokens) / self.rate_limit)
+        self._buckets[key] = (tokens - 1, now)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the bounded queue up to the deadline, or shed."""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full", retry_after=self.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self._reject("timeout", retry_after=self.queue_timeout)
+        except BaseException:  # client went away while queued
+            self._discard(waiter)
+            raise
+
+        waited = time.perf_counter() - start
+        self.queued += 1
+        self.queue_time_total += waited
+        self.queue_time_max = max(self.queue_time_max, waited)
+        self.admitted += 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            # Already handed a slot by `release`; give it to the next waiter.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted,
+            "shed_total": dict(self.shed),
+            "queue_time_ms": {
+                "count": self.queued,
+                "total": round(self.queue_time_total * 1000, 3),
+                "max": round(self.queue_time_max * 1000, 3),
+            },
+        }
+
+
+def get_controller(name: str) -> AdmissionController:
+    """The controller for route `name`, created from the environment on first use."""
+    if name not in _controllers:
+        _controllers[name] = AdmissionController.from_env(name)
+    return _controllers[name]
+
+
+def admission_metrics() -> dict:
+    """Shed and queue-time counters for every guarded route."""
+    return {name: c.snapshot() for name, c in sorted(_controllers.items())}
+
+
+def admission_guard(name: str, key_dependency: Optional[Callable] = None):
+    """
+    FastAPI dependency admitting requests to route `name`.
+
+    With `key_dependency` (e.g. `verify_bearer`), its return value keys the
+    per-token rate limit; rate limiting is checked before any queueing.
+    """
+    controller = get_controller(name)
+
+    async def _admit():
+        with phase("admission"):
+            await controller.acquire()
+        try:
+            yield
+        finally:
+            controller.release()
+
+    if key_dependency is None:
+        return _admit
+
+    async def _admit_keyed(key: str = Depends(key_dependency)):
+        with phase("admission"):
+            controller.check_rate(key)
+            await controller.acquire()
+        try:
+            yield
+        finally:
+            controller.release()
+
+    return _admit_keyed
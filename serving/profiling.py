@@ -0,0 +1,300 @@
+"""
+Opt-in, per-request profiling for the FastAPI apps.
+
+When enabled, a sampled fraction of requests, and any request carrying
+`X-Profile: <PROFILING_TOKEN>`, is profiled with cProfile. Each one writes
+two files to PROFILING_DIR:
+
+- `<id>.prof`: pstats dump (`python -m pstats`, snakeviz, ...),
+- `<id>.json`: wall time per phase plus the top functions by cumulative time.
+
+Phases:
+
+- auth: code wrapped in `phase("auth")`, e.g. bearer verification.
+- admission: time queued by admission control.
+- validation: everything else before the handler (routing, body parsing,
+  request validation, other dependencies).
+- handler: the endpoint function itself.
+- serialization: from the handler's return to the response being sent.
+
+Only the newest PROFILING_MAX_FILES profiles are kept; other files in
+PROFILING_DIR are never deleted.
+
+Configuration (environment):
+
+    PROFILING_ENABLED=false      # master switch; nothing is installed when off
+    PROFILING_SAMPLE_RATE=0.0    # fraction of requests to profile
+    PROFILING_TOKEN=             # enables the X-Profile header when set
+    PROFILING_DIR=profiles
+    PROFILING_MAX_FILES=200
+
+When disabled, `install_profiling` adds no middleware and wraps no
+endpoints. The `phase()` markers then cost only a ContextVar lookup.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import cProfile
+import functools
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = b"x-profile"
+TOP_FUNCTIONS = 25
+
+# Report names written by `_write`; retention never touches anything else.
+_REPORT_RE = re.compile(r"^\d{8}T\d{6}_[A-Z]+_[A-Za-z0-9_]+_[0-9a-f]{8}\.json$")
+
+_NULL = nullcontext()
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool = False
+    sample_rate: float = 0.0
+    token: str = ""
+    directory: Path = Path("profiles")
+    max_files: int = 200
+
+    @classmethod
+    def from_env(cls) -> "ProfilingConfig":
+        return cls(
+            enabled=os.getenv("PROFILING_ENABLED", "false").lower() in {"1", "true", "yes"},
+            sample_rate=float(os.getenv("PROFILING_SAMPLE_RATE", "0")),
+            token=os.getenv("PROFILING_TOKEN", ""),
+            directory=Path(os.getenv("PROFILING_DIR", "profiles")),
+            max_files=int(os.getenv("PROFILING_MAX_FILES", "200")),
+        )
+
+
+@dataclass
+class _RequestProfile:
+    method: str
+    path: str
+    start: float = field(default_factory=time.perf_counter)
+    phases: dict = field(default_factory=dict)
+    marks: dict = field(default_factory=dict)
+    profilers: list = field(default_factory=list)
+    status_code: Optional[int] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark(self, name: str) -> None:
+        self.marks.setdefault(name, time.perf_counter())
+
+
+_current: contextvars.ContextVar[Optional[_RequestProfile]] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+@contextmanager
+def _timed(profile: _RequestProfile, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
+
+
+def phase(name: str):
+    """Attribute the enclosed block to `name` when the current request is profiled."""
+    profile = _current.get()
+    return _NULL if profile is None else _timed(profile, name)
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    """An enabled profiler, or None if another one is already active.
+
+    Python 3.12+ allows one active profiler per interpreter (it hooks
+    sys.monitoring, which also covers worker threads); callers then fall
+    back to the wall-clock phase marks.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def _wrap_endpoint(call):
+    """Mark handler start/end; sync handlers also get a cProfile in their worker thread where allowed."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return await call(*args, **kwargs)
+            profile.mark("handler_start")
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profile.mark("handler_end")
+        return async_endpoint
+
+    @functools.wraps(call)
+    def sync_endpoint(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        profile.mark("handler_start")
+        profiler = _start_profiler()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profile.profilers.append(profiler)
+            profile.mark("handler_end")
+    return sync_endpoint
+
+
+class ProfilingMiddleware:
+    """ASGI middleware selecting requests to profile and writing their reports."""
+
+    def __init__(self, app, config: ProfilingConfig):
+        self.app = app
+        self.config = config
+        self._loop_profiler_busy = False
+        self._retention_lock = threading.Lock()  # reports are written from worker threads
+
+    def _selected(self, scope) -> bool:
+        if self.config.token:
+            for name, value in scope.get("headers", ()):
+                if name == DEBUG_HEADER:
+                    return hmac.compare_digest(value, self.config.token.encode())
+        return self.config.sample_rate > 0 and random.random() < self.config.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = _RequestProfile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.mark("response_start")
+                profile.status_code = message["status"]
+            await send(message)
+
+        # Only one cProfile can be active on the event-loop thread at a time.
+        loop_profiler = None
+        if not self._loop_profiler_busy:
+            loop_profiler = _start_profiler()
+            self._loop_profiler_busy = loop_profiler is not None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if loop_profiler is not None:
+                loop_profiler.disable()
+                profile.profilers.insert(0, loop_profiler)
+                self._loop_profiler_busy = False
+            _current.reset(token)
+            end = time.perf_counter()
+            try:
+                # pstats and file I/O would otherwise stall every request on the loop
+                await asyncio.to_thread(self._write, profile, end)
+            except Exception as e:
+                logger.warning("Could not write request profile: %s", e)
+
+    def _write(self, profile: _RequestProfile, end: float) -> None:
+        marks = profile.marks
+        handler_start = marks.get("handler_start", marks.get("response_start", end))
+        handler_end = marks.get("handler_end", handler_start)
+        response_start = marks.get("response_start", end)
+
+        auth = profile.phases.get("auth", 0.0)
+        admission = profile.phases.get("admission", 0.0)
+        phases_ms = {
+            "auth": auth,
+            "admission": admission,
+            "validation": max(0.0, handler_start - profile.start - auth - admission),
+            "handler": handler_end - handler_start,
+            "serialization": max(0.0, response_start - handler_end),
+            "total": end - profile.start,
+        }
+        phases_ms = {k: round(v * 1000, 3) for k, v in phases_ms.items()}
+
+        directory = self.config.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", profile.path).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}_{profile.method}_{slug}_{uuid.uuid4().hex[:8]}"
+
+        top = []
+        if profile.profilers:
+            stats = pstats.Stats(profile.profilers[0])
+            for extra in profile.profilers[1:]:
+                stats.add(extra)
+            stats.dump_stats(directory / f"{name}.prof")
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            for (filename, line, func), (_, ncalls, tottime, cumtime, _) in rows[:TOP_FUNCTIONS]:
+                top.append({
+                    "function": f"{filename}:{line}({func})",
+                    "ncalls": ncalls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                })
+
+        report = {
+            "method": profile.method,
+            "path": profile.path,
+            "status_code": profile.status_code,
+            "phases_ms": phases_ms,
+            "top_functions": top,
+        }
+        (directory / f"{name}.json").write_text(json.dumps(report, indent=2))
+        logger.info("request profile written", extra={"profile": name, "path": profile.path, **phases_ms})
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        with self._retention_lock:
+            reports = sorted(
+                (p for p in self.config.directory.glob("*.json") if _REPORT_RE.match(p.name)),
+                key=lambda p: p.stat().st_mtime,
+            )
+            for old in reports[: max(0, len(reports) - self.config.max_files)]:
+                old.unlink(missing_ok=True)
+                old.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def install_profiling(app: FastAPI, config: Optional[ProfilingConfig] = None) -> bool:
+    """
+    Add profiling to `app` if enabled; call after all routes are registered.
+
+    Returns whether profiling was installed.
+    """
+    config = config or ProfilingConfig.from_env()
+    if not config.enabled:
+        return False
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = _wrap_endpoint(route.dependant.call)
+    app.add_middleware(ProfilingMiddleware, config=config)
+    logger.info(
+        "Request profiling enabled",
+        extra={"sample_rate": config.sample_rate, "directory": str(config.directory)},
+    )
+    return True
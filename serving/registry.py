@@ -0,0 +1,208 @@
+"""
+Model registry shared by the FastAPI apps.
+
+Resolves a `model_name` to a versioned artifact on disk, loads it lazily and
+keeps the hot set in memory under a byte budget, evicting least recently
+used models first.
+
+Artifact layout under the registry root (optionally inside a namespace
+directory, e.g. one per router):
+
+    <root>/[<namespace>/]<name>/<version>.joblib|.json   # versioned
+    <root>/[<namespace>/]<name>.joblib|.json             # unversioned (legacy)
+
+`name` resolves to the highest version (compared numerically where
+possible); `name@version` pins one. Sessions should pin the version they
+resolved at start-up so a newly published version doesn't change results
+mid-session.
+
+A model's memory cost is approximated by its artifact size on disk, which
+for joblib/pickle artifacts is close to the unpickled footprint.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+
+DEFAULT_BYTE_BUDGET = int(os.getenv("MODEL_CACHE_BYTES", str(512 * 1024 * 1024)))
+
+LOADERS: dict[str, Callable[[Path], Any]] = {
+    ".joblib": joblib.load,
+    ".json": lambda path: json.loads(path.read_text()),
+}
+
+UNVERSIONED = "unversioned"
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")  # no path separators or leading dots
+
+
+class ModelNotFoundError(LookupError):
+    """No artifact matches the requested model name/version."""
+
+
+@dataclass(frozen=True)
+class ModelRef:
+    namespace: str
+    name: str
+    version: str
+    path: Path
+
+    @property
+    def key(self) -> str:
+        prefix = f"{self.namespace}/" if self.namespace else ""
+        return f"{prefix}{self.name}@{self.version}"
+
+
+@dataclass
+class _Stats:
+    loads: int = 0
+    load_time_ms: float = 0.0
+    last_load_ms: float = 0.0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+def _version_key(version: str):
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", version) if part]
+
+
+class ModelRegistry:
+    """Lazy, size-bounded LRU cache of models resolved from a directory of artifacts."""
+
+    def __init__(
+        self,
+        root: Path | str,
+        byte_budget: int = DEFAULT_BYTE_BUDGET,
+        suffixes: tuple[str, ...] = tuple(LOADERS),
+    ):
+        self.root = Path(root)
+        self.suffixes = suffixes
+        self.byte_budget = byte_budget
+        self._cache: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._resident_bytes = 0
+        self._stats: dict[str, _Stats] = {}
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, model_name: str, namespace: str = "") -> ModelRef:
+        """`name` or `name@version` -> the artifact it refers to."""
+        name, _, version = model_name.partition("@")
+        if not _NAME_RE.match(name) or (version and not _NAME_RE.match(version)):
+            raise ModelNotFoundError(f"Invalid model name {model_name!r}")
+        base = self.root / namespace if namespace else self.root
+
+        versions = {}
+        model_dir = base / name
+        if model_dir.is_dir():
+            for path in model_dir.iterdir():
+                if path.suffix in self.suffixes:
+                    versions[path.stem] = path
+        if not versions:
+            for suffix in self.suffixes:
+                if (base / f"{name}{suffix}").is_file():
+                    versions[UNVERSIONED] = base / f"{name}{suffix}"
+                    break
+
+        if version:
+            if version not in versions:
+                raise ModelNotFoundError(f"Model {name!r} has no version {version!r}")
+        elif versions:
+            version = max(versions, key=_version_key)
+        else:
+            raise ModelNotFoundError(f"Unknown model {model_name!r}")
+        return ModelRef(namespace, name, version, versions[version])
+
+    def get(self, model: str | ModelRef, namespace: str = "") -> Any:
+        """Return the loaded model, loading it on first use (once, even under concurrency)."""
+        ref = model if isinstance(model, ModelRef) else self.resolve(model, namespace)
+        key = ref.key
+
+        with self._lock:
+            stats = self._stats.setdefault(key, _Stats())
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                stats.hits += 1
+                return self._cache[key][0]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another request may have finished loading while we waited.
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    stats.hits += 1
+                    return self._cache[key][0]
+                stats.misses += 1
+
+            try:
+                start = time.perf_counter()
+                loaded = LOADERS[ref.path.suffix](ref.path)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                size = ref.path.stat().st_size
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+
+            # Publish and retire the load lock together: a request arriving in
+            # between would otherwise miss the cache and load the model again.
+            with self._lock:
+                stats.loads += 1
+                stats.load_time_ms += elapsed_ms
+                stats.last_load_ms = elapsed_ms
+                stats.bytes = size
+                self._cache[key] = (loaded, size)
+                self._resident_bytes += size
+                self._loading.pop(key, None)
+                self._evict(keep=key)
+        return loaded
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used models until under budget (never `keep`)."""
+        while self._resident_bytes > self.byte_budget and len(self._cache) > 1:
+            key = next(iter(self._cache))
+            if key == keep:
+                self._cache.move_to_end(key)
+                continue
+            _, size = self._cache.pop(key)
+            self._resident_bytes -= size
+            self._stats[key].evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._resident_bytes = 0
+
+    def stats(self) -> dict:
+        """Per-model load time, memory and hit rate, plus totals for the cache."""
+        with self._lock:
+            models = {}
+            for key, s in sorted(self._stats.items()):
+                lookups = s.hits + s.misses
+                models[key] = {
+                    "resident": key in self._cache,
+                    "bytes": s.bytes,
+                    "loads": s.loads,
+                    "last_load_ms": round(s.last_load_ms, 3),
+                    "total_load_ms": round(s.load_time_ms, 3),
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "hit_rate": round(s.hits / lookups, 4) if lookups else None,
+                    "evictions": s.evictions,
+                }
+            return {
+                "byte_budget": self.byte_budget,
+                "resident_bytes": self._resident_bytes,
+                "models": models,
+            }
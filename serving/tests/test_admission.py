@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from serving.admission import AdmissionController, get_controller
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_admits_up_to_limit_then_queues_in_order():
+    async def scenario():
+        c = AdmissionController("t", max_concurrency=2, max_queue=2, queue_timeout=1.0)
+        await c.acquire()
+        await c.acquire()
+        assert c.in_flight == 2
+
+        order = []
+
+        async def waiter(tag):
+            await c.acquire()
+            order.append(tag)
+
+        tasks = [asyncio.create_task(waiter("a")), asyncio.create_task(waiter("b"))]
+        await asyncio.sleep(0)
+        assert c.snapshot()["waiting"] == 2
+
+        c.release()
+        c.release()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b"]
+        assert c.in_flight == 2
+        assert c.snapshot()["queue_time_ms"]["count"] == 2
+
+    run(scenario())
+
+
+def test_sheds_when_queue_full():
+    async def scenario():
+        c = AdmissionController("t", max_concurrency=1, max_queue=0, queue_timeout=1.0)
+        await c.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await c.acquire()
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+        assert c.snapshot()["shed_total"]["queue_full"] == 1
+
+    run(scenario())
+
+
+def test_sheds_after_queue_deadline_and_frees_queue_slot():
+    async def scenario():
+        c = AdmissionController("t", max_concurrency=1, max_queue=1, queue_timeout=0.01)
+        await c.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await c.acquire()
+        assert exc.value.status_code == 503
+        assert c.snapshot()["waiting"] == 0
+        assert c.snapshot()["shed_total"]["timeout"] == 1
+
+        c.release()
+        assert c.in_flight == 0
+
+    run(scenario())
+
+
+def test_rate_limit_per_key():
+    c = AdmissionController("t", rate_limit=1, burst=2)
+    c.check_rate("token-a")
+    c.check_rate("token-a")
+    with pytest.raises(HTTPException) as exc:
+        c.check_rate("token-a")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+    c.check_rate("token-b")  # other tokens have their own bucket
+    assert c.snapshot()["shed_total"]["rate_limited"] == 1
+
+
+def test_fractional_rate_admits_one_request_per_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("serving.admission.time.monotonic", lambda: now[0])
+    c = AdmissionController("t", rate_limit=0.5)
+    assert c.burst == 1.0
+
+    c.check_rate("token-a")
+    with pytest.raises(HTTPException) as exc:
+        c.check_rate("token-a")
+    assert exc.value.headers["Retry-After"] == "2"
+
+    now[0] += 2.0
+    c.check_rate("token-a")
+
+
+def test_invalid_limits_rejected():
+    with pytest.raises(ValueError):
+        AdmissionController("t", max_concurrency=0)
+    with pytest.raises(ValueError):
+        AdmissionController("t", rate_limit=1, burst=0.5)
+
+
+def test_api_service_rate_limits_by_bearer_token(monkeypatch):
+    from api_service.app.main import app
+
+    client = TestClient(app)
+    auth = {"Authorization": "Bearer mysecrettoken"}
+    rid = client.post("/v1/tyre_degradation/init", json={
+        "model_name": "baseline", "event_name": "Monza", "year": 2024,
+        "car_no": 1, "n_laps": 10, "initial_wear": 0.1,
+    }, headers=auth).json()["request_id"]
+
+    controller = get_controller("tyre_degradation")
+    monkeypatch.setattr(controller, "rate_limit", 0.001)
+    monkeypatch.setattr(controller, "burst", 1.0)
+    monkeypatch.setattr(controller, "_buckets", {})
+
+    assert client.get(f"/v1/tyre_degradation/predict?request_id={rid}", headers=auth).status_code == 200
+    r = client.get(f"/v1/tyre_degradation/predict?request_id={rid}", headers=auth)
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+
+    metrics = client.get("/metrics").json()["admission"]["tyre_degradation"]
+    assert metrics["shed_total"]["rate_limited"] >= 1
+    assert metrics["in_flight"] == 0
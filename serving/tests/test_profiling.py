@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import pstats
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from serving.admission import admission_guard
+from serving.profiling import ProfilingConfig, ProfilingMiddleware, install_profiling, phase
+
+TOKEN = "debug-secret"
+
+
+def verify(x: str = "k"):
+    with phase("auth"):
+        return x
+
+
+def make_app(tmp_path, **overrides):
+    app = FastAPI()
+
+    @app.get("/sync", dependencies=[Depends(admission_guard("profiling_test", verify))])
+    def sync_route():
+        return {"values": [i * i for i in range(1000)]}
+
+    @app.get("/async")
+    async def async_route():
+        return {"ok": True}
+
+    config = ProfilingConfig(enabled=True, token=TOKEN, directory=tmp_path, **overrides)
+    assert install_profiling(app, config)
+    return app
+
+
+def reports(tmp_path):
+    return sorted(tmp_path.glob("*.json"))
+
+
+def test_debug_header_writes_profile_with_phases(tmp_path):
+    client = TestClient(make_app(tmp_path))
+    assert client.get("/sync", headers={"X-Profile": TOKEN}).status_code == 200
+
+    [report_path] = reports(tmp_path)
+    assert report_path.with_suffix(".prof").is_file()
+    report = json.loads(report_path.read_text())
+    assert report["path"] == "/sync" and report["status_code"] == 200
+    phases = report["phases_ms"]
+    assert set(phases) == {"auth", "admission", "validation", "handler", "serialization", "total"}
+    assert phases["handler"] > 0
+    assert sum(v for k, v in phases.items() if k != "total") <= phases["total"] + 0.01
+    assert report["top_functions"]
+
+    # The sync handler's worker-thread profile is merged into the dump.
+    stats = pstats.Stats(str(report_path.with_suffix(".prof")))
+    assert any(func == "sync_route" for _, _, func in stats.stats)
+
+
+def test_sync_route_survives_an_already_active_profiler(tmp_path):
+    # On Python 3.12+ only one profiler may be active per interpreter; the
+    # request must still succeed and fall back to wall-clock phases.
+    client = TestClient(make_app(tmp_path))
+    outer = cProfile.Profile()
+    outer.enable()
+    try:
+        r = client.get("/sync", headers={"X-Profile": TOKEN})
+    finally:
+        outer.disable()
+    assert r.status_code == 200
+
+    [report_path] = reports(tmp_path)
+    phases = json.loads(report_path.read_text())["phases_ms"]
+    assert phases["handler"] > 0 and phases["total"] >= phases["handler"]
+
+
+def test_unselected_requests_are_not_profiled(tmp_path):
+    client = TestClient(make_app(tmp_path))
+    assert client.get("/async").status_code == 200
+    assert client.get("/async", headers={"X-Profile": "wrong"}).status_code == 200
+    assert reports(tmp_path) == []
+
+
+def test_sampling_and_retention(tmp_path):
+    unrelated = [tmp_path / "settings.json", tmp_path / "settings.prof"]
+    for path in unrelated:
+        path.write_text("{}")
+    client = TestClient(make_app(tmp_path, sample_rate=1.0, max_files=3))
+    for _ in range(5):
+        client.get("/async")
+    assert len([p for p in reports(tmp_path) if p not in unrelated]) == 3
+    assert len([p for p in tmp_path.glob("*.prof") if p not in unrelated]) == 3
+    # Files the profiler did not write are left alone
+    assert all(path.exists() for path in unrelated)
+
+
+def test_failed_report_write_does_not_fail_the_request(tmp_path, monkeypatch, caplog):
+    def broken_write(self, profile, end):
+        raise RuntimeError("stats exploded")
+
+    monkeypatch.setattr(ProfilingMiddleware, "_write", broken_write)
+    client = TestClient(make_app(tmp_path))
+    assert client.get("/sync", headers={"X-Profile": TOKEN}).status_code == 200
+    assert "stats exploded" in caplog.text
+
+
+def test_disabled_installs_nothing(tmp_path):
+    app = FastAPI()
+
+    @app.get("/")
+    def root():
+        return {}
+
+    endpoint = app.routes[-1].dependant.call
+    assert not install_profiling(app, ProfilingConfig(enabled=False, directory=tmp_path))
+    assert app.routes[-1].dependant.call is endpoint
+    assert not any(m.cls is ProfilingMiddleware for m in app.user_middleware)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from serving import registry as registry_module
+from serving.registry import ModelNotFoundError, ModelRegistry
+
+
+def _write(path, payload, pad=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({**payload, "pad": "x" * pad}))
+
+
+@pytest.fixture
+def root(tmp_path):
+    _write(tmp_path / "ns" / "m" / "2.json", {"v": 2})
+    _write(tmp_path / "ns" / "m" / "10.json", {"v": 10})
+    _write(tmp_path / "flat.json", {"v": "flat"})
+    return tmp_path
+
+
+def test_resolves_latest_version_numerically(root):
+    reg = ModelRegistry(root)
+    assert reg.resolve("m", "ns").version == "10"
+    assert reg.get("m", "ns")["v"] == 10
+    assert reg.get("m@2", "ns")["v"] == 2
+
+
+def test_resolves_unversioned_artifact(root):
+    ref = ModelRegistry(root).resolve("flat")
+    assert ref.version == "unversioned"
+
+
+@pytest.mark.parametrize("name", ["missing", "m@3", "../ns/m", "..", "m@../../x"])
+def test_unknown_or_invalid_names(root, name):
+    with pytest.raises(ModelNotFoundError):
+        ModelRegistry(root).resolve(name, "ns")
+
+
+def test_lru_eviction_under_byte_budget(tmp_path):
+    for name in "abc":
+        _write(tmp_path / name / "1.json", {"name": name}, pad=1000)
+    reg = ModelRegistry(tmp_path, byte_budget=2500)
+
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")  # a is now most recently used
+    reg.get("c")  # evicts b
+
+    stats = reg.stats()
+    assert stats["resident_bytes"] <= 2500
+    assert stats["models"]["a@1"]["resident"]
+    assert not stats["models"]["b@1"]["resident"]
+    assert stats["models"]["b@1"]["evictions"] == 1
+    assert stats["models"]["a@1"]["hit_rate"] == 0.5
+
+
+def test_concurrent_first_requests_load_once(root, monkeypatch):
+    calls = []
+
+    def slow_load(path):
+        calls.append(path)
+        time.sleep(0.05)
+        return {"loaded": str(path)}
+
+    monkeypatch.setitem(registry_module.LOADERS, ".json", slow_load)
+    reg = ModelRegistry(root)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("m", "ns"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    stats = reg.stats()["models"]["ns/m@10"]
+    assert stats["loads"] == 1 and stats["misses"] == 1 and stats["hits"] == 7
+    assert stats["last_load_ms"] >= 50
+
+
+class _HookLock:
+    """Lock that runs a one-shot callback right after a release."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.after_release = None
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        callback, self.after_release = self.after_release, None
+        if callback:
+            callback()
+
+
+def test_request_right_after_load_hits_cache(root, monkeypatch):
+    reg = ModelRegistry(root)
+    hook = _HookLock()
+    reg._lock = hook
+    calls, results = [], []
+
+    def second_request():
+        t = threading.Thread(target=lambda: results.append(reg.get("m", "ns")))
+        t.start()
+        t.join(timeout=5)
+
+    def load(path):
+        calls.append(path)
+        if len(calls) == 1:
+            # Fire a concurrent request at the first lock release after loading.
+            hook.after_release = second_request
+        return {"loaded": str(path)}
+
+    monkeypatch.setitem(registry_module.LOADERS, ".json", load)
+    first = reg.get("m", "ns")
+
+    assert len(calls) == 1
+    assert results == [first]
+    stats = reg.stats()
+    assert stats["resident_bytes"] == stats["models"]["ns/m@10"]["bytes"]